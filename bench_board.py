@@ -0,0 +1,209 @@
+"""
+Headless benchmark of the board hot paths.
+
+    python bench_board.py [--repeat N] [--output results.json]
+    python bench_board.py --output new.json --compare old.json
+
+Runs with SDL_VIDEODRIVER=dummy on random layouts from 5x5 up to 40x40 and
+times parse_level, Board.__init__, a recorded drag trace that draws the whole
+solution (each Board.handle_event call, and Board.update once per simulated
+frame), _check_solved, and Board.draw frames. Prints p50/p90/p99 in
+microseconds per case and can save them as JSON; --compare flags metrics
+whose p50 grew past --threshold and exits with status 1 if any did.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from colors import COLOR_MAP
+from game import Board, CompactBoard
+import level_notation
+
+# (height, width, colors)
+CASES = [(5, 5, 2), (9, 9, 6), (15, 15, 10), (25, 25, 14), (40, 40, 16)]
+BOARD_PIXELS = 800  # cells are shrunk so every board fits this many pixels
+
+
+def make_case(height, width, colors, seed):
+    """
+    A random level and a drag trace solving it: (level_data, paths as (row, col) lists).
+    The grid is walked in a row-by-row snake cut into `colors` pieces of random
+    length, so every size and color count works; the level need not be unique.
+    """
+    rng = random.Random(seed)
+    snake = []
+    for r in range(height):
+        cols = range(width) if r % 2 == 0 else range(width - 1, -1, -1)
+        snake.extend((r, c) for c in cols)
+    cuts = sorted(rng.sample(range(2, len(snake) - 1), colors - 1)) if colors > 1 else []
+    trace = []
+    start = 0
+    for cut in cuts + [len(snake)]:
+        if cut - start >= 2:
+            trace.append(snake[start:cut])
+            start = cut
+    # A piece too short to cut joins the last path
+    trace[-1].extend(snake[start:])
+    grid = [[None] * width for _ in range(height)]
+    for letter, path in zip(COLOR_MAP, trace):
+        for r, c in (path[0], path[-1]):
+            grid[r][c] = letter
+    return level_notation.encode_level(grid), trace
+
+
+def drag_events(trace, cell_size):
+    """Mouse events that draw each path of trace from one endpoint to the other."""
+    def pos(cell):
+        r, c = cell
+        return (c * cell_size + cell_size // 2, r * cell_size + cell_size // 2)
+
+    events = []
+    for path in trace:
+        events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos(path[0])))
+        for cell in path[1:]:
+            events.append(pygame.event.Event(pygame.MOUSEMOTION, buttons=(1, 0, 0),
+                                             pos=pos(cell), rel=(0, 0)))
+        events.append(pygame.event.Event(pygame.MOUSEBUTTONUP, button=1, pos=pos(path[-1])))
+    return events
+
+
+def percentiles(samples):
+    """Summary of samples (in seconds) as microseconds."""
+    samples = sorted(samples)
+    n = len(samples)
+
+    def at(q):
+        return round(samples[min(n - 1, int(q * n))] * 1e6, 2)
+
+    return {"n": n, "p50": at(0.50), "p90": at(0.90), "p99": at(0.99),
+            "mean": round(sum(samples) / n * 1e6, 2)}
+
+
+def bench_case(board_class, height, width, colors, repeat, seed):
+    level, trace = make_case(height, width, colors, seed)
+    cell_size = max(4, min(60, BOARD_PIXELS // max(height, width)))
+    events = drag_events(trace, cell_size)
+    screen = pygame.Surface((width * cell_size, height * cell_size))
+    clock = time.perf_counter
+    quiet = io.StringIO()
+    times = {name: [] for name in ("parse", "init", "event", "update", "drag", "check_solved",
+                                   "first_draw", "draw", "draw_dirty")}
+
+    for _ in range(repeat):
+        level_notation.parse_cache_clear()
+        t = clock()
+        level_notation.parse_level(level, letters=True)
+        times["parse"].append(clock() - t)
+
+        t = clock()
+        board = board_class(level, cell_size=cell_size)
+        times["init"].append(clock() - t)
+
+        t = clock()
+        board.draw(screen)
+        times["first_draw"].append(clock() - t)
+
+        drag = 0.0
+        for i, event in enumerate(events):
+            t = clock()
+            with contextlib.redirect_stdout(quiet):  # "Puzzle solved!"
+                board.handle_event(event)
+            elapsed = clock() - t
+            times["event"].append(elapsed)
+            drag += elapsed
+            if i % 8 == 7:
+                # A frame every few events, like the game loop: apply queued motion, then draw
+                t = clock()
+                board.update(0)
+                elapsed = clock() - t
+                times["update"].append(elapsed)
+                drag += elapsed
+                t = clock()
+                board.draw(screen, full=False)
+                times["draw_dirty"].append(clock() - t)
+        times["drag"].append(drag)
+        if not board.solved:
+            raise RuntimeError("drag trace did not solve the %dx%d level" % (height, width))
+
+        t = clock()
+        with contextlib.redirect_stdout(quiet):
+            board._check_solved()
+        times["check_solved"].append(clock() - t)
+
+        t = clock()
+        board.draw(screen)
+        times["draw"].append(clock() - t)
+
+    return {name: percentiles(samples) for name, samples in times.items() if samples}
+
+
+def compare(base, results, threshold):
+    """Print p50 ratios against a saved run; returns the number of regressions."""
+    regressions = 0
+    print("%-12s %-13s %12s %12s %8s" % ("case", "metric", "base p50", "new p50", "ratio"))
+    for case, metrics in results["cases"].items():
+        old_metrics = base.get("cases", {}).get(case, {})
+        for name, stats in metrics.items():
+            old = old_metrics.get(name)
+            if not old or not old["p50"]:
+                continue
+            ratio = stats["p50"] / old["p50"]
+            flag = ""
+            if ratio > threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print("%-12s %-13s %12.2f %12.2f %7.2fx%s"
+                  % (case, name, old["p50"], stats["p50"], ratio, flag))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Board parsing, input and drawing.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compact", action="store_true", help="benchmark CompactBoard")
+    parser.add_argument("--output", help="save results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="p50 ratio counted as a regression (default 1.25)")
+    args = parser.parse_args(argv)
+
+    pygame.display.init()
+    pygame.font.init()
+    board_class = CompactBoard if args.compact else Board
+    results = {"board": board_class.__name__, "repeat": args.repeat, "seed": args.seed,
+               "python": platform.python_version(), "pygame": pygame.version.ver,
+               "cases": {}}
+
+    print("%-12s %-13s %10s %10s %10s" % ("case", "metric", "p50 us", "p90 us", "p99 us"))
+    for height, width, colors in CASES:
+        case = "%dx%d/%d" % (height, width, colors)
+        metrics = bench_case(board_class, height, width, colors, args.repeat, args.seed)
+        results["cases"][case] = metrics
+        for name, stats in metrics.items():
+            print("%-12s %-13s %10.2f %10.2f %10.2f"
+                  % (case, name, stats["p50"], stats["p90"], stats["p99"]))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            base = json.load(f)
+        print()
+        if compare(base, results, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Throughput benchmark for level_notation.
+
+    python bench_codec.py [--repeat N]
+
+Prints levels/second for cold decoding (cache cleared), cached decoding,
+flat decoding and encoding, on random grids from 6x5 up to 40x40, next to
+the original uncached character-by-character decoder ("legacy") so a
+regression in the cold path shows up as a ratio below 1.
+"""
+import argparse
+import random
+import time
+
+from colors import COLOR_MAP
+import level_notation
+
+SIZES = [(6, 5), (9, 9), (15, 15), (25, 25), (40, 40)]
+
+
+def legacy_parse_level(level_data):
+    """The codec's first decoder, kept verbatim as the baseline for cold parses."""
+    height, width, encoded = level_data
+    cells = []
+    row = []
+    i = 0
+
+    while i < len(encoded):
+        ch = encoded[i]
+        if ch.isdigit():
+            num_str = ""
+            while i < len(encoded) and encoded[i].isdigit():
+                num_str += encoded[i]
+                i += 1
+            count = int(num_str)
+            for _ in range(count):
+                row.append(None)
+                if len(row) == width:
+                    cells.append(row)
+                    row = []
+        else:
+            color = COLOR_MAP.get(ch, None)
+            row.append(color)
+            i += 1
+            if len(row) == width:
+                cells.append(row)
+                row = []
+
+    if row:
+        while len(row) < width:
+            row.append(None)
+        cells.append(row)
+
+    return height, width, cells
+
+
+def random_level(height, width, colors, rng):
+    grid = [[None] * width for _ in range(height)]
+    cells = rng.sample(range(height * width), 2 * colors)
+    letters = list(COLOR_MAP)[:colors]
+    for i, cell in enumerate(cells):
+        grid[cell // width][cell % width] = letters[i // 2]
+    return level_notation.encode_level(grid)
+
+
+def rate(func, items, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            func(item)
+    return repeat * len(items) / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the level codec.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--levels", type=int, default=200, help="distinct levels per size")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    print("%-8s %14s %14s %8s %14s %14s %14s"
+          % ("size", "legacy/s", "cold/s", "ratio", "cached/s", "flat/s", "encode/s"))
+    for height, width in SIZES:
+        colors = min(len(COLOR_MAP), height * width // 8)
+        levels = [random_level(height, width, colors, rng) for _ in range(args.levels)]
+        grids = [level_notation.parse_level(level)[2] for level in levels]
+
+        def cold(level):
+            level_notation.parse_cache_clear()
+            level_notation.parse_level(level)
+
+        legacy_rate = rate(legacy_parse_level, levels, args.repeat)
+        cold_rate = rate(cold, levels, args.repeat)
+        level_notation.parse_cache_clear()
+        cached_rate = rate(level_notation.parse_level, levels, args.repeat)
+        flat_rate = rate(lambda level: level_notation.parse_level(level, flat=True), levels, args.repeat)
+        encode_rate = rate(level_notation.encode_level, grids, args.repeat)
+        print("%-8s %14.0f %14.0f %8.2f %14.0f %14.0f %14.0f"
+              % ("%dx%d" % (height, width), legacy_rate, cold_rate, cold_rate / legacy_rate,
+                 cached_rate, flat_rate, encode_rate))
+
+
+if __name__ == "__main__":
+    main()
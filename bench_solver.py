@@ -0,0 +1,73 @@
+"""
+Timing benchmark for solver.py.
+
+    python bench_solver.py [--levels N] [--time-limit S] [--seed N]
+
+Solves random solvable layouts (from generator.random_layout) of each size,
+once for any solution and once counting up to two, as the generator and
+validator do. Prints how many finished within the time limit, median and
+worst seconds, and search nodes per second.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from colors import COLOR_MAP
+from generator import random_layout
+from solver import Solver
+
+# (height, width, colors)
+SIZES = [(7, 7, 6), (9, 9, 8), (12, 12, 12), (15, 15, 16)]
+
+
+def layouts(height, width, colors, count, rng):
+    """count grids holding the endpoints of random covering layouts."""
+    grids = []
+    while len(grids) < count:
+        paths = random_layout(height, width, colors, rng)
+        if paths is None:
+            continue
+        grid = [[None] * width for _ in range(height)]
+        for letter, path in zip(COLOR_MAP, paths):
+            for cell in (path[0], path[-1]):
+                grid[cell // width][cell % width] = letter
+        grids.append(grid)
+    return grids
+
+
+def run(height, width, grids, max_solutions, time_limit):
+    """(finished, median s, worst s, nodes/s) over grids."""
+    finished = 0
+    times = []
+    nodes = 0
+    for grid in grids:
+        result = Solver(height, width, grid).solve(max_solutions, time_limit=time_limit)
+        # Counting finishes by exhausting the search or by finding the second solution
+        finished += result.solved if max_solutions == 1 else (result.complete or result.solutions > 1)
+        times.append(result.elapsed)
+        nodes += result.nodes
+    return finished, statistics.median(times), max(times), nodes / sum(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the level solver.")
+    parser.add_argument("--levels", type=int, default=10, help="layouts per size")
+    parser.add_argument("--time-limit", type=float, default=5.0, help="seconds per solve")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    print("%-12s %-6s %9s %10s %10s %10s" % ("size", "mode", "finished", "median s", "worst s", "nodes/s"))
+    for height, width, colors in SIZES:
+        grids = layouts(height, width, colors, args.levels, rng)
+        for mode, max_solutions in (("solve", 1), ("count", 2)):
+            finished, median, worst, rate = run(height, width, grids, max_solutions, args.time_limit)
+            print("%-12s %-6s %5d/%-3d %10.4f %10.4f %10.0f"
+                  % ("%dx%d/%d" % (height, width, colors), mode, finished, len(grids), median, worst, rate))
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    main()
+    print("total %.1f s" % (time.perf_counter() - start))
@@ -0,0 +1,72 @@
+"""
+Cold-start benchmark: every sample is a fresh Python process.
+
+    python bench_startup.py [--repeat N] [--window]
+
+Times importing each tool-facing module (and whether that pulls in pygame),
+and the game's time to first frame as printed by main.py, which quits right
+after it under FLOW_STARTUP_EXIT. Without --window the game runs on SDL's
+dummy video driver. Prints the median and best of N runs in milliseconds.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Modules tools and servers load, plus game for comparison
+MODULES = ["board_state", "level_notation", "solver", "generator", "validate_levels", "game"]
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import %s
+print((time.perf_counter() - start) * 1000, "pygame" in sys.modules)
+"""
+
+
+def time_import(module):
+    """(milliseconds, loaded pygame) for importing module in a new interpreter."""
+    out = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT % module], cwd=HERE,
+                         capture_output=True, text=True, check=True).stdout.split()
+    return float(out[-2]), out[-1] == "True"
+
+
+def time_first_frame(window=False):
+    """(first frame, imports, init) in milliseconds, from main.py's startup report."""
+    env = dict(os.environ, FLOW_STARTUP_EXIT="1", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    if not window:
+        env["SDL_VIDEODRIVER"] = "dummy"
+    out = subprocess.run([sys.executable, "main.py"], cwd=HERE, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    line = next(line for line in out.splitlines() if line.startswith("Startup:"))
+    numbers = [float(word) for word in line.replace("(", " ").split() if word.replace(".", "").isdigit()]
+    return tuple(numbers[:3])
+
+
+def summary(samples):
+    return "median %8.1f  best %8.1f" % (statistics.median(samples), min(samples))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import and first-frame times.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--window", action="store_true", help="open a real window")
+    args = parser.parse_args(argv)
+
+    print("import (ms)")
+    for module in MODULES:
+        runs = [time_import(module) for _ in range(args.repeat)]
+        pygame_note = "  loads pygame" if runs[0][1] else ""
+        print("  %-16s %s%s" % (module, summary([ms for ms, _ in runs]), pygame_note))
+
+    runs = [time_first_frame(args.window) for _ in range(args.repeat)]
+    print("main.py (ms)")
+    for i, name in enumerate(("first frame", "imports", "init")):
+        print("  %-16s %s" % (name, summary([run[i] for run in runs])))
+
+
+if __name__ == "__main__":
+    main()
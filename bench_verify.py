@@ -0,0 +1,152 @@
+"""
+Load test for verify_server.py.
+
+    python bench_verify.py [--requests 20000] [--connections 8] [--workers N]
+    python bench_verify.py --port 8765        # against a server already running
+
+Without --port a server is started in a subprocess on a free port. Random
+solved layouts are submitted over several pipelined connections, about a
+fifth of them spoiled (a cell dropped from one path) so both answers are
+exercised; every reply is compared with the expected verdict. Prints
+verifications per second and reply latency percentiles.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+from colors import COLOR_MAP
+from generator import random_layout
+from level_notation import encode_level
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_submissions(count, size, colors, seed):
+    """count (level, paths, expected ok) triples from a pool of random solved layouts."""
+    rng = random.Random(seed)
+    solved = []
+    while len(solved) < min(count, 50):
+        layout = random_layout(size, size, colors, rng)
+        if layout is None:
+            continue
+        grid = [[None] * size for _ in range(size)]
+        paths = {}
+        for letter, path in zip(COLOR_MAP, layout):
+            cells = [list(divmod(cell, size)) for cell in path]
+            for r, c in (cells[0], cells[-1]):
+                grid[r][c] = letter
+            paths[letter] = cells
+        solved.append((encode_level(grid), paths))
+
+    submissions = []
+    for i in range(count):
+        level, paths = solved[i % len(solved)]
+        if rng.random() < 0.2:
+            paths = dict(paths)
+            color = rng.choice(sorted(paths))
+            path = paths[color]
+            paths[color] = path[:len(path) // 2] + path[len(path) // 2 + 1:]
+            submissions.append((level, paths, False))
+        else:
+            submissions.append((level, paths, True))
+    return submissions
+
+
+def percentile(samples, p):
+    return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+
+
+async def run_connection(host, port, requests, window, latencies, wrong):
+    """Send (id, request line, expected ok) triples on one connection, keeping up to window unanswered."""
+    reader, writer = await asyncio.open_connection(host, port, limit=2 ** 20)
+    slots = asyncio.Semaphore(window)
+    sent = {}  # id -> (send time, expected ok)
+
+    async def receive():
+        for _ in requests:
+            reply = json.loads(await reader.readline())
+            started, expected = sent.pop(reply["id"])
+            latencies.append(time.perf_counter() - started)
+            wrong[0] += reply["ok"] != expected
+            slots.release()
+
+    receiver = asyncio.ensure_future(receive())
+    for request_id, line, expected in requests:
+        await slots.acquire()
+        sent[request_id] = (time.perf_counter(), expected)
+        writer.write(line)
+        await writer.drain()
+    await receiver
+    writer.close()
+
+
+async def load_test(host, port, submissions, connections, window):
+    latencies = []
+    wrong = [0]
+    # Encoded up front, so the client spends its time on the socket
+    requests = [(i, (json.dumps({"id": i, "level": level, "paths": paths}) + "\n").encode(), expected)
+                for i, (level, paths, expected) in enumerate(submissions)]
+    shares = [requests[i::connections] for i in range(connections)]
+    start = time.perf_counter()
+    await asyncio.gather(*(run_connection(host, port, share, window, latencies, wrong)
+                           for share in shares))
+    return time.perf_counter() - start, sorted(latencies), wrong[0]
+
+
+def start_server(workers, batch):
+    """Run verify_server.py on a free port; returns (process, port) once it's listening."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    command = [sys.executable, "verify_server.py", "--port", str(port), "--batch", str(batch)]
+    if workers:
+        command += ["--workers", str(workers)]
+    process = subprocess.Popen(command, cwd=HERE, stdout=subprocess.PIPE, text=True)
+    process.stdout.readline()  # "Verifying on ..."
+    return process, port
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the solution verification service.")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--window", type=int, default=256, help="unanswered requests per connection")
+    parser.add_argument("--size", type=int, default=9)
+    parser.add_argument("--colors", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="use a running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=None, help="server worker processes")
+    parser.add_argument("--batch", type=int, default=256, help="server batch size")
+    args = parser.parse_args(argv)
+
+    submissions = make_submissions(args.requests, args.size, args.colors, args.seed)
+    process = None
+    port = args.port
+    if port is None:
+        process, port = start_server(args.workers, args.batch)
+    try:
+        elapsed, latencies, wrong = asyncio.run(
+            load_test(args.host, port, submissions, args.connections, args.window))
+    finally:
+        if process is not None:
+            process.send_signal(signal.SIGINT)  # lets it shut its worker pool down
+            process.wait()
+
+    print("%d verifications in %.2f s: %.0f/s" % (len(submissions), elapsed, len(submissions) / elapsed))
+    print("latency ms: p50 %.1f  p90 %.1f  p99 %.1f  max %.1f"
+          % tuple(1000 * percentile(latencies, p) for p in (50, 90, 99, 100)))
+    if wrong:
+        print("%d replies disagreed with the expected verdict" % wrong)
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
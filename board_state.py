@@ -0,0 +1,412 @@
+"""
+The rules of a level without any display: endpoints, paths and who owns each
+cell, drags applied cell by cell, undo/redo and the solved check. Imports
+nothing but the level parser, so solvers, servers and other tools can load
+it without pygame. game.Board adds input handling and drawing on top.
+"""
+from array import array
+from level_notation import parse_level
+
+
+class BoardState:
+    def __init__(self, level_data):
+        # Colors are kept as letters, as in the level format
+        self.height, self.width, self.grid = parse_level(level_data, letters=True)
+
+        # Find endpoints: color -> list of endpoint cells [(r1,c1), (r2,c2)]
+        self.endpoints = {}
+        for r in range(self.height):
+            for c in range(self.width):
+                color = self.grid[r][c]
+                if color is not None:
+                    if color not in self.endpoints:
+                        self.endpoints[color] = []
+                    self.endpoints[color].append((r, c))
+
+        self.reset()
+
+    def reset(self):
+        """
+        Clear every path and the undo history, keeping the parsed grid, so
+        restarting a level costs no re-parse.
+        """
+        # paths[color] = list of (row, col) describing final path from one endpoint to the other
+        # or None if that color not yet solved
+        self.paths = {color: None for color in self.endpoints}
+
+        self._init_owner()
+
+        # Running counters so solved/fill queries never rescan the grid
+        self._filled = 0        # cells currently claimed by any path
+        self._connected = 0     # colors with a stored endpoint-to-endpoint path
+        self._regions = None    # cached empty-region sizes, None when stale
+
+        # For user‐in‐progress path
+        self.current_path = []
+        self.current_color = None
+
+        self.solved = False  # Will be True once puzzle is solved
+
+        # Undo journal: one (cell changes, path changes) entry per finished move
+        self.undo_stack = []
+        self.redo_stack = []
+        self._move_cells = None  # cell -> owner before the open move, None if no move is open
+        self._move_paths = None  # color -> path before the open move
+
+    # --- Moves -----------------------------------------------------------
+    # A drag is press(cell), drag_to(cell) for each cell the pointer enters,
+    # then release(). Once the puzzle is solved, moves are ignored.
+
+    def press(self, cell):
+        """Start a drag at cell if it's an endpoint. Returns True if a drag started."""
+        if self.current_color is not None:
+            # No release() since the last press (e.g. a lost mouse-up): finish that drag first
+            self.release()
+        if self.solved or cell is None:
+            return False
+        color = self.grid[cell[0]][cell[1]]
+        # Only start a path if it's an endpoint cell
+        if color is None:
+            self._reset_current()
+            return False
+        self._begin_move()
+        # Redrawing a color replaces its previous path
+        self._clear_path(color)
+        self._start_path(cell, color)
+        return True
+
+    def drag_to(self, cell):
+        """Move the drag in progress onto cell (see _try_add_cell)."""
+        if not self.solved:
+            self._try_add_cell(cell)
+
+    def release(self):
+        """Finish the drag: keep the path if it joins its endpoints, then check for a win."""
+        if self.solved:
+            return
+        if self.current_color is not None:
+            # Check if path is valid: starts at endpoints[color][0] or [1], ends at the other
+            start = self.current_path[0]
+            end = self.current_path[-1]
+            ep = self.endpoints[self.current_color]
+            # We want a path that starts at ep[0] and ends at ep[1] (or vice versa)
+            if (start in ep and end in ep and start != end):
+                # This path is valid: store it
+                self._store_path(self.current_color, list(self.current_path))
+            else:
+                # Invalid path => remove it from cell_owner
+                self._release_current()
+
+        self._reset_current()
+        self._end_move()
+
+        # Check if puzzle is solved
+        self._check_solved()
+
+    def set_path(self, color, cells):
+        """
+        Store a finished path for color as if the player had drawn it, e.g. from
+        a hint. Any other path it crosses is broken, as with a drag.
+        """
+        self._abort_move()
+        self._begin_move()
+        self._clear_path(color)
+        for cell in cells:
+            owner = self._owner(cell)
+            if owner is not None and owner != color:
+                self._clear_path(owner)
+            self._set_owner(cell, color)
+        self._store_path(color, list(cells))
+        self._end_move()
+        self._check_solved()
+
+    def undo(self):
+        """Revert the last finished move. Returns False if there was nothing to undo."""
+        self._abort_move()
+        if not self.undo_stack:
+            return False
+        move = self.undo_stack.pop()
+        self._replay(move, undo=True)
+        self.redo_stack.append(move)
+        return True
+
+    def redo(self):
+        """Re-apply the last undone move. Returns False if there was nothing to redo."""
+        self._abort_move()
+        if not self.redo_stack:
+            return False
+        move = self.redo_stack.pop()
+        self._replay(move, undo=False)
+        self.undo_stack.append(move)
+        return True
+
+    def _try_add_cell(self, cell):
+        """Attempt to add 'cell' to current path, handle collisions, adjacency, etc."""
+        if not self.current_path:
+            return
+        last_cell = self.current_path[-1]
+        if cell == last_cell:
+            return
+
+        # Another color's endpoint blocks the path
+        endpoint = self.grid[cell[0]][cell[1]]
+        if endpoint is not None and endpoint != self.current_color:
+            return
+
+        # Check adjacency
+        if abs(cell[0] - last_cell[0]) + abs(cell[1] - last_cell[1]) == 1:
+            # If this cell is occupied by a different color, remove that color's path
+            owner = self._owner(cell)
+            if owner is not None and owner != self.current_color:
+                self._clear_path(owner)
+
+            # If we've already visited this cell in our path, backtrack
+            idx = self._path_index(cell)
+            if idx >= 0:
+                self._truncate_path(idx + 1)
+            else:
+                self._append_path(cell)
+
+    # --- Ownership state -------------------------------------------------
+    # BoardState keeps cell_owner as nested lists; CompactBoardState swaps in
+    # flat arrays by overriding _owner/_store_owner. Everything else goes
+    # through these helpers, so both behave the same and the progress
+    # counters stay exact.
+
+    def _init_owner(self):
+        # cell_owner[r][c] = which color currently occupies that cell’s path, or None if unused
+        self.cell_owner = [[None for _ in range(self.width)] for _ in range(self.height)]
+
+    def _owner(self, cell):
+        r, c = cell
+        return self.cell_owner[r][c]
+
+    def _store_owner(self, cell, color):
+        r, c = cell
+        self.cell_owner[r][c] = color
+
+    def _set_owner(self, cell, color):
+        old = self._owner(cell)
+        if self._move_cells is not None and cell not in self._move_cells:
+            self._move_cells[cell] = old
+        was_empty = old is None
+        if was_empty != (color is None):
+            self._filled += 1 if was_empty else -1
+            self._regions = None
+        self._store_owner(cell, color)
+
+    def _store_path(self, color, path):
+        if self._move_paths is not None and color not in self._move_paths:
+            self._move_paths[color] = self.paths[color]
+        if (self.paths[color] is None) != (path is None):
+            self._connected += 1 if path is not None else -1
+        self.paths[color] = path
+
+    def _path_index(self, cell):
+        """Position of cell in current_path, or -1 if it's not on it."""
+        if cell in self.current_path:
+            return self.current_path.index(cell)
+        return -1
+
+    def _start_path(self, cell, color):
+        self.current_path = [cell]
+        self.current_color = color
+        self._set_owner(cell, color)
+
+    def _append_path(self, cell):
+        self.current_path.append(cell)
+        self._set_owner(cell, self.current_color)
+
+    def _truncate_path(self, length):
+        """Backtrack current_path to its first `length` cells, releasing the rest."""
+        for cell in self.current_path[length:]:
+            self._set_owner(cell, None)
+        del self.current_path[length:]
+
+    def _reset_current(self):
+        self.current_path = []
+        self.current_color = None
+
+    def _release_current(self):
+        for cell in self.current_path:
+            if self._owner(cell) == self.current_color:
+                self._set_owner(cell, None)
+
+    def _clear_path(self, color):
+        """Remove a stored path and free its cells."""
+        path = self.paths[color]
+        if path:
+            for cell in path:
+                self._set_owner(cell, None)
+            self._store_path(color, None)
+
+    # --- Undo journal ----------------------------------------------------
+    # A move (one drag, or one set_path) is journaled as its net effect:
+    # ((cell, old_owner, new_owner), ...) and ((color, old_path, new_path), ...).
+    # Cells claimed and released again while dragging drop out, so an entry
+    # is as small as what the move changed, never a copy of the board.
+
+    def _begin_move(self):
+        self._end_move()
+        self._move_cells = {}
+        self._move_paths = {}
+
+    def _end_move(self):
+        if self._move_cells is None:
+            return
+        cells = tuple((cell, old, self._owner(cell))
+                      for cell, old in self._move_cells.items() if self._owner(cell) != old)
+        paths = tuple((color, old, self.paths[color])
+                      for color, old in self._move_paths.items() if self.paths[color] != old)
+        self._move_cells = self._move_paths = None
+        if cells or paths:
+            self.undo_stack.append((cells, paths))
+            self.redo_stack.clear()
+
+    def _abort_move(self):
+        """Throw away a drag in progress, restoring everything it changed."""
+        cells, paths = self._move_cells, self._move_paths
+        self._move_cells = self._move_paths = None
+        if cells is not None:
+            for cell, old in cells.items():
+                self._set_owner(cell, old)
+            for color, old in paths.items():
+                self._store_path(color, old)
+        self._reset_current()
+
+    def _replay(self, move, undo):
+        cells, paths = move
+        for cell, old, new in cells:
+            self._set_owner(cell, old if undo else new)
+        for color, old, new in paths:
+            self._store_path(color, old if undo else new)
+        self.solved = False
+        self._check_solved()
+
+    # --- Progress queries (all O(1) except a stale empty_regions) ---------
+
+    @property
+    def filled_cells(self):
+        """Number of cells claimed by a stored or in-progress path."""
+        return self._filled
+
+    @property
+    def fill_percent(self):
+        return 100.0 * self._filled / (self.height * self.width)
+
+    @property
+    def flows_connected(self):
+        """Number of colors whose endpoints are joined by a stored path."""
+        return self._connected
+
+    @property
+    def complete(self):
+        """True if all colors are connected and every cell is filled."""
+        return (self._connected == len(self.endpoints)
+                and self._filled == self.height * self.width)
+
+    @property
+    def empty_regions(self):
+        """Sizes of the connected areas of empty cells, recomputed only after a change."""
+        if self._regions is None:
+            seen = set()
+            sizes = []
+            for r in range(self.height):
+                for c in range(self.width):
+                    if (r, c) in seen or self._owner((r, c)) is not None:
+                        continue
+                    seen.add((r, c))
+                    todo = [(r, c)]
+                    size = 0
+                    while todo:
+                        rr, cc = todo.pop()
+                        size += 1
+                        for nr, nc in ((rr - 1, cc), (rr + 1, cc), (rr, cc - 1), (rr, cc + 1)):
+                            if (0 <= nr < self.height and 0 <= nc < self.width
+                                    and (nr, nc) not in seen and self._owner((nr, nc)) is None):
+                                seen.add((nr, nc))
+                                todo.append((nr, nc))
+                    sizes.append(size)
+            self._regions = sizes
+        return list(self._regions)
+
+    def _check_solved(self):
+        """Set self.solved = True if all colors have valid paths and entire board is filled."""
+        if self.complete:
+            self.solved = True
+
+
+class CompactBoardState(BoardState):
+    """
+    BoardState with compact ownership state, for holding many boards at once.
+
+    Colors are mapped to small integer ids, ownership lives in a flat
+    array('b') indexed by r * width + c, and current_path carries a cell ->
+    position index. Membership tests, backtracking and path removal cost
+    O(1) or O(cells changed) instead of O(path length). cell_owner is still
+    readable as cell_owner[r][c], resolving ids back to colors.
+    """
+    def _init_owner(self):
+        self.color_ids = {color: i + 1 for i, color in enumerate(self.endpoints)}
+        self.id_colors = [None] + list(self.endpoints)
+        self.owner = array('b', bytes(self.height * self.width))
+        self.path_pos = {}
+
+    @property
+    def cell_owner(self):
+        return _OwnerView(self)
+
+    def _owner(self, cell):
+        return self.id_colors[self.owner[cell[0] * self.width + cell[1]]]
+
+    def _store_owner(self, cell, color):
+        self.owner[cell[0] * self.width + cell[1]] = self.color_ids[color] if color is not None else 0
+
+    def _path_index(self, cell):
+        return self.path_pos.get(cell, -1)
+
+    def _start_path(self, cell, color):
+        super()._start_path(cell, color)
+        self.path_pos = {cell: 0}
+
+    def _append_path(self, cell):
+        self.path_pos[cell] = len(self.current_path)
+        super()._append_path(cell)
+
+    def _truncate_path(self, length):
+        for cell in self.current_path[length:]:
+            del self.path_pos[cell]
+        super()._truncate_path(length)
+
+    def _reset_current(self):
+        super()._reset_current()
+        self.path_pos = {}
+
+
+class _OwnerView:
+    """Read/write cell_owner[r][c] access over a CompactBoardState's flat array."""
+    def __init__(self, board):
+        self.board = board
+
+    def __len__(self):
+        return self.board.height
+
+    def __getitem__(self, r):
+        return _OwnerRow(self.board, r)
+
+
+class _OwnerRow:
+    def __init__(self, board, r):
+        self.board = board
+        self.r = r
+
+    def __len__(self):
+        return self.board.width
+
+    def __getitem__(self, c):
+        if not 0 <= c < self.board.width:
+            raise IndexError(c)
+        return self.board._owner((self.r, c))
+
+    def __setitem__(self, c, color):
+        self.board._set_owner((self.r, c), color)
@@ -1,18 +1,19 @@
 import pygame
+from fonts import get_font, render_text
 
 class Button:
     def __init__(self, rect, text, callback, font=None, text_color=(255,255,255), bg_color=(50,50,50)):
         self.rect = pygame.Rect(rect)
         self.text = text
         self.callback = callback
-        self.font = font or pygame.font.SysFont(None, 36)
+        self.font = font or get_font(None, 36)
         self.text_color = text_color
         self.bg_color = bg_color
 
     def draw(self, surface):
         pygame.draw.rect(surface, self.bg_color, self.rect)
         pygame.draw.rect(surface, (255,255,255), self.rect, width=2)  # border
-        text_surf = self.font.render(self.text, True, self.text_color)
+        text_surf = render_text(self.text, self.text_color, font=self.font)
         text_rect = text_surf.get_rect(center=self.rect.center)
         surface.blit(text_surf, text_rect)
 
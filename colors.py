@@ -17,3 +17,49 @@ COLOR_MAP = {
     'o': (17, 128, 127),  # teal
     'p': (252, 34, 147),  # dark pink
 }
+
+# The built-in scheme; a scheme only needs to list the letters it recolors
+DEFAULT_COLORS = dict(COLOR_MAP)
+
+# Bumped by set_scheme, so a Palette can tell it is stale without comparing colors
+scheme_version = 0
+
+
+def set_scheme(scheme):
+    """Make scheme (letter -> RGB) the active colors; letters it leaves out keep their defaults."""
+    global scheme_version
+    COLOR_MAP.clear()
+    COLOR_MAP.update(DEFAULT_COLORS)
+    COLOR_MAP.update(scheme)
+    scheme_version += 1
+
+
+class Palette:
+    """
+    A board's color letters as small ints for 8-bit surfaces, resolved to RGB
+    through the active scheme only when drawing. Switching schemes then
+    means set_palette on the cached layers, not re-parsing or re-drawing them.
+    """
+    BACKGROUND = 0  # also the colorkey of transparent layers
+    GRID = 1
+
+    def __init__(self, letters):
+        self.index = {letter: i for i, letter in enumerate(letters, 2)}
+        self.version = None
+
+    def rgb(self, letter):
+        return COLOR_MAP.get(letter) or DEFAULT_COLORS.get(letter, (255, 255, 255))
+
+    def colors(self):
+        return [(0, 0, 0), (200, 200, 200)] + [self.rgb(letter) for letter in self.index]
+
+    @property
+    def stale(self):
+        return self.version != scheme_version
+
+    def apply(self, *surfaces):
+        """Load the current scheme into 8-bit surfaces."""
+        colors = self.colors()
+        for surface in surfaces:
+            surface.set_palette(colors)
+        self.version = scheme_version
@@ -0,0 +1,64 @@
+import pygame
+from collections import OrderedDict
+
+# (name, size) -> pygame.font.Font, shared by every screen and button.
+# The default font is the file bundled with pygame, loaded directly: SysFont
+# scans every installed font (through fontconfig on Linux) on its first call,
+# which is most of a cold start. Named fonts still go through SysFont.
+_fonts = {}
+
+
+def get_font(name=None, size=36):
+    """Return the shared font for (name, size), creating it on first use."""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        if name is None:
+            font = pygame.font.Font(None, size)
+        else:
+            font = pygame.font.SysFont(name, size)
+        _fonts[key] = font
+    return font
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, color)."""
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (font, text, tuple(color))
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = font.render(text, True, color)
+        self._surfaces[key] = surf
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+
+text_cache = TextCache()
+
+
+def render_text(text, color, size=36, name=None, font=None):
+    """
+    Render text through the shared cache. Callers holding their own Font
+    object pass it as `font`; otherwise the registry font for (name, size)
+    is used. Returned surfaces are shared, so don't draw onto them.
+    """
+    if font is None:
+        font = get_font(name, size)
+    return text_cache.render(font, text, color)
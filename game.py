@@ -1,34 +1,56 @@
 import pygame
-from level_notation import parse_level
-
-class Board:
-    def __init__(self, level_data, cell_size=60):
-        self.cell_size = cell_size
-        self.height, self.width, self.grid = parse_level(level_data)
-
-        # Find endpoints: color -> list of endpoint cells [(r1,c1), (r2,c2)]
-        self.endpoints = {}
-        for r in range(self.height):
-            for c in range(self.width):
-                color = self.grid[r][c]
-                if color is not None:
-                    if color not in self.endpoints:
-                        self.endpoints[color] = []
-                    self.endpoints[color].append((r, c))
-
-        # paths[color] = list of (row, col) describing final path from one endpoint to the other
-        # or None if that color not yet solved
-        self.paths = {color: None for color in self.endpoints}
-
-        # cell_owner[r][c] = which color currently occupies that cell’s path, or None if unused
-        self.cell_owner = [[None for _ in range(self.width)] for _ in range(self.height)]
-
-        # For user‐in‐progress path
-        self.current_path = []
-        self.current_color = None
+from board_state import BoardState, CompactBoardState
+from colors import Palette
+from fonts import render_text
+from viewport import Viewport
+
+class Board(BoardState):
+    """BoardState plus mouse and keyboard input and cached, view-culled drawing."""
+    def __init__(self, level_data, cell_size=60, view_rect=None):
+        # Parses the level and finds the endpoints (see board_state.py)
+        super().__init__(level_data)
+
+        # Where the board appears on screen. Without a view_rect it is drawn whole,
+        # from the top left; otherwise it is fitted into view_rect (at most
+        # cell_size per cell) and can be zoomed and scrolled within it.
+        if view_rect is None:
+            self.view = Viewport((0, 0, self.width * cell_size, self.height * cell_size),
+                                 cell_size, self.height, self.width)
+        else:
+            self.view = Viewport.fit(view_rect, self.height, self.width, cell_size)
+        self._panning = False
+
+        # Colors are kept as letters and only turned into RGB by self.palette when drawing
+        self.palette = Palette(sorted(self.endpoints))
+
+        # Render caches, covering just the view: grid + endpoints change only
+        # when the view moves, stored paths only on mouse-up or when broken.
+        # _dirty collects cells touched since the last draw so draw(full=False)
+        # can repaint just that area; _repaint asks for the whole view.
+        self._static_layer = None
+        self._path_layer = None
+        self._layer_view = None  # (x, y, cell_size) of the view the layers were drawn for
+        self._repaint = True
+
+    def reset(self):
+        """
+        Clear every path and the undo history, keeping the parsed grid and
+        the cached static layer, so restarting a level costs no re-parse.
+        """
+        super().reset()
+        self._path_pos = {}     # cell -> (color, index) along its stored path, for _render_paths
+        self._dirty = set()     # cells changed since the last draw
         self.mouse_down = False
+        self._motion = []       # pointer positions since the last flush_motion()
+        self._last_pos = None   # last pointer position applied to the drag
 
-        self.solved = False  # Will be True once puzzle is solved
+        self._path_layer = None
+        self._repaint = True
+        self._banner_drawn = False
+
+    @property
+    def cell_size(self):
+        return self.view.cell_size
 
     def handle_event(self, event):
         """Handle Pygame events."""
@@ -38,92 +60,253 @@ class Board:
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:  # left click
                 self.mouse_down = True
-                cell = self._cell_from_mouse()
-                if cell is not None:
-                    r, c = cell
-                    color = self.grid[r][c]
-                    # Only start a path if it's an endpoint cell
-                    if color is not None:
-                        self.current_path = [cell]
-                        self.current_color = color
-                    else:
-                        self.current_path = []
-                        self.current_color = None
+                if self.press(self._cell_from_mouse(event.pos)):
+                    self._last_pos = event.pos
+            elif event.button in (2, 3):
+                self._panning = True
+
+        elif event.type == pygame.MOUSEWHEEL:
+            self._view_moved(self.view.zoom(1.25 ** event.y, pygame.mouse.get_pos()))
+
+        elif event.type == pygame.KEYDOWN:
+            step = self.cell_size
+            moves = {pygame.K_LEFT: (step, 0), pygame.K_RIGHT: (-step, 0),
+                     pygame.K_UP: (0, step), pygame.K_DOWN: (0, -step)}
+            if event.key in moves:
+                self._view_moved(self.view.pan(*moves[event.key]))
+            elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                self._view_moved(self.view.zoom(1.25))
+            elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                self._view_moved(self.view.zoom(0.8))
 
         elif event.type == pygame.MOUSEMOTION:
-            if self.mouse_down and self.current_color is not None:
-                cell = self._cell_from_mouse()
-                if cell is not None:
-                    self._try_add_cell(cell)
+            if self._panning:
+                self._view_moved(self.view.pan(*event.rel))
+            elif self.mouse_down and self.current_color is not None:
+                # Applied in one batch per frame by flush_motion()
+                self._motion.append(event.pos)
 
         elif event.type == pygame.MOUSEBUTTONUP:
-            if event.button == 1:
+            if event.button in (2, 3):
+                self._panning = False
+            elif event.button == 1:
+                self.flush_motion()
                 self.mouse_down = False
-                if self.current_color is not None and len(self.current_path) > 1:
-                    # Check if path is valid: starts at endpoints[color][0] or [1], ends at the other
-                    start = self.current_path[0]
-                    end = self.current_path[-1]
-                    ep = self.endpoints[self.current_color]
-                    # We want a path that starts at ep[0] and ends at ep[1] (or vice versa)
-                    if (start in ep and end in ep and start != end):
-                        # This path is valid: store it
-                        self.paths[self.current_color] = list(self.current_path)
-                    else:
-                        # Invalid path => remove it from cell_owner
-                        for (r, c) in self.current_path:
-                            if self.cell_owner[r][c] == self.current_color:
-                                self.cell_owner[r][c] = None
-
-                self.current_path = []
-                self.current_color = None
-
-                # Check if puzzle is solved
-                self._check_solved()
+                self.release()
 
     def update(self, dt):
-        pass
+        self.flush_motion()
+
+    def flush_motion(self):
+        """
+        Apply the motion events queued since the last call. Each step between
+        two recorded positions adds every cell the pointer crossed, so a fast
+        drag doesn't skip cells, and the whole batch is one path update.
+        """
+        if not self._motion:
+            return
+        positions = self._motion
+        self._motion = []
+        if self.current_color is None:
+            return
+        last = self._last_pos
+        for pos in positions:
+            if last is None or last == pos:
+                cells = [self._cell_from_mouse(pos)]
+            else:
+                cells = self._cells_between(last, pos)
+            for cell in cells:
+                if cell is not None:
+                    self.drag_to(cell)
+            last = pos
+        self._last_pos = last
 
-    def draw(self, screen):
-        screen.fill((0, 0, 0))  # black background
+    def prerender(self):
+        """Build the cached layers now (e.g. on a loader thread) rather than on the first draw."""
+        if self._static_layer is None:
+            self._static_layer = self._render_static()
+            self._layer_view = (self.view.x, self.view.y, self.view.cell_size)
+        if self._path_layer is None:
+            self._path_layer = self._render_paths()
+        if self.palette.stale:
+            # The color scheme changed: recolor the layers and repaint the whole board
+            self.palette.apply(self._static_layer, self._path_layer)
+            self._repaint = True
 
-        # Draw grid lines + endpoints
-        for r in range(self.height):
-            for c in range(self.width):
-                x = c * self.cell_size
-                y = r * self.cell_size
-                rect = pygame.Rect(x, y, self.cell_size, self.cell_size)
-                pygame.draw.rect(screen, (200, 200, 200), rect, width=1)
+    def draw(self, screen, full=True):
+        """
+        Draw the board and return the list of screen rects that changed.
 
-                # If it's an endpoint in the original grid, draw a circle
-                if self.grid[r][c] is not None:
-                    color = self.grid[r][c]
-                    center = (x + self.cell_size // 2, y + self.cell_size // 2)
-                    radius = self.cell_size // 2 - 4
-                    pygame.draw.circle(screen, color, center, radius)
+        With full=False only the cells touched since the previous draw (plus a
+        one-cell margin for the path segments joining them) are repainted, and
+        an unchanged board draws nothing and returns []. Only cells inside the
+        view are ever drawn, so the cost follows what is on screen.
+        """
+        self.prerender()
 
-        # Draw final paths (for each color)
-        for color, path_cells in self.paths.items():
-            if path_cells:
-                self._draw_path(screen, path_cells, color)
+        view_rect = self.view.rect
+        if full:
+            screen.fill((0, 0, 0))  # black background
+            area = view_rect
+        elif self._repaint:
+            area = view_rect
+        elif self._dirty:
+            area = self._dirty_area().clip(view_rect)
+        else:
+            area = None
+        self._dirty = set()
+        self._repaint = False
 
-        # Draw the current, in‐progress path
-        if self.current_path and self.current_color:
-            self._draw_path(screen, self.current_path, self.current_color, in_progress=True)
+        rects = []
+        if area:
+            old_clip = screen.get_clip()
+            screen.set_clip(area)
+            layer_area = area.move(-view_rect.x, -view_rect.y)
+            screen.blit(self._static_layer, area.topleft, layer_area)
+            screen.blit(self._path_layer, area.topleft, layer_area)
+            # Draw the current, in‐progress path
+            if self.current_path and self.current_color:
+                self._draw_path(screen, self.current_path, self.palette.rgb(self.current_color),
+                                in_progress=True,
+                                offset=(self.view.x - view_rect.x, self.view.y - view_rect.y))
+            screen.set_clip(old_clip)
+            rects.append(area)
 
-        if self.solved:
+        if self.solved and (area or not self._banner_drawn):
             # Draw a "solved" message
-            font = pygame.font.SysFont(None, 48)
-            text_surf = font.render("Puzzle solved!", True, (255, 255, 0))
-            screen.blit(text_surf, (20, 20))
+            text_surf = render_text("Puzzle solved!", (255, 255, 0), size=48)
+            rects.append(screen.blit(text_surf, (20, 20)))
+            self._banner_drawn = True
+        return rects
+
+    def _view_moved(self, moved):
+        if not moved:
+            return
+        self._repaint = True
+        if self._static_layer is None:
+            self._path_layer = None
+            return
+        x, y, size = self._layer_view
+        dx, dy = x - self.view.x, y - self.view.y
+        width, height = self.view.rect.size
+        if size != self.view.cell_size or abs(dx) >= width or abs(dy) >= height:
+            # Zoomed, or scrolled a whole view away: the layers are redrawn for the new view
+            self._static_layer = None
+            self._path_layer = None
+            return
+        # Panned: scroll what is already drawn and draw only the strips that came into view
+        self._layer_view = (self.view.x, self.view.y, size)
+        strips = []
+        if dx:
+            strips.append(pygame.Rect(0 if dx > 0 else width + dx, 0, abs(dx), height))
+        if dy:
+            strips.append(pygame.Rect(0, 0 if dy > 0 else height + dy, width, abs(dy)))
+        self._static_layer.scroll(dx, dy)
+        for strip in strips:
+            self._render_static(self._static_layer, strip)
+        if self._path_layer is not None:
+            self._path_layer.scroll(dx, dy)
+            for strip in strips:
+                self._render_paths(self._path_layer, strip)
 
-    def _draw_path(self, screen, path_cells, color, in_progress=False):
+    def _new_layer(self, size=None):
+        """8-bit surface (default: view-sized) in palette indices, so recoloring it is a set_palette call."""
+        layer = pygame.Surface(size or self.view.rect.size, depth=8)
+        self.palette.apply(layer)
+        layer.fill(Palette.BACKGROUND)
+        return layer
+
+    def _render(self, draw, layer, area):
+        """
+        Redraw area (layer pixels, default all) of layer, a new one if None,
+        with draw(surface, origin, cell range), origin being the board pixel
+        at the surface's top left.
+
+        Drawing goes to a scratch surface one cell larger all round and is
+        then copied in: pygame drops the parts of thick lines whose centre
+        line falls outside the clip, so drawing straight into area would
+        leave seams where a scrolled layer meets a redrawn strip.
+        """
+        if layer is None:
+            layer = self._new_layer()
+        if area is None:
+            area = layer.get_rect()
+        size = self.cell_size
+        scratch_rect = area.inflate(2 * size, 2 * size)
+        scratch = self._new_layer(scratch_rect.size)
+        origin = (self.view.x + scratch_rect.x, self.view.y + scratch_rect.y)
+        # Layer pixels are offset from the screen by the view's top left
+        cells = self.view.visible(scratch_rect.move(self.view.rect.topleft))
+        draw(scratch, origin, cells)
+        layer.blit(scratch, area, pygame.Rect((size, size), area.size))
+        return layer
+
+    def _render_static(self, layer=None, area=None):
+        """Layer of grid lines and endpoint circles of the visible cells, or redraw area of layer."""
+        return self._render(self._draw_static, layer, area)
+
+    def _render_paths(self, layer=None, area=None):
+        """Transparent layer with the stored path segments touching visible cells, or redraw area of layer."""
+        layer = self._render(self._draw_paths, layer, area)
+        layer.set_colorkey(Palette.BACKGROUND)
+        return layer
+
+    def _draw_static(self, surface, origin, cells):
+        size = self.cell_size
+        row0, col0, row1, col1 = cells
+        for r in range(row0, row1):
+            for c in range(col0, col1):
+                x = c * size - origin[0]
+                y = r * size - origin[1]
+                rect = pygame.Rect(x, y, size, size)
+                pygame.draw.rect(surface, Palette.GRID, rect, width=1)
+
+                # If it's an endpoint in the original grid, draw a circle
+                if self.grid[r][c] is not None:
+                    color = self.palette.index[self.grid[r][c]]
+                    center = (x + size // 2, y + size // 2)
+                    radius = size // 2 - max(1, size // 15)
+                    pygame.draw.circle(surface, color, center, radius)
+
+    def _draw_paths(self, surface, origin, cells):
+        row0, col0, row1, col1 = cells
+        for r in range(row0, row1):
+            for c in range(col0, col1):
+                entry = self._path_pos.get((r, c))
+                if entry is None:
+                    continue
+                color, i = entry
+                path = self.paths[color]
+                index = self.palette.index[color]
+                if len(path) == 1:
+                    self._draw_path(surface, path, index, offset=origin)
+                    continue
+                # Each segment once: towards the next cell, and towards the
+                # previous one only when that cell is outside the range
+                if i + 1 < len(path):
+                    self._draw_path(surface, path[i:i + 2], index, offset=origin)
+                if i > 0:
+                    pr, pc = path[i - 1]
+                    if not (row0 <= pr < row1 and col0 <= pc < col1):
+                        self._draw_path(surface, path[i - 1:i + 1], index, offset=origin)
+
+    def _dirty_area(self):
+        """Screen rect covering the dirty cells and their neighbours."""
+        rows = [r for r, _ in self._dirty]
+        cols = [c for _, c in self._dirty]
+        return self.view.cells_rect(min(rows) - 1, min(cols) - 1, max(rows) + 1, max(cols) + 1)
+
+    def _draw_path(self, screen, path_cells, color, in_progress=False, offset=(0, 0)):
+        # color is RGB, or a palette index when drawing on a layer; offset is
+        # the board pixel drawn at the surface's top left
         # Convert cell coords to pixel coords
+        size = self.cell_size
         points = []
         for (r, c) in path_cells:
-            x = c * self.cell_size + self.cell_size / 2
-            y = r * self.cell_size + self.cell_size / 2
+            x = c * size + size / 2 - offset[0]
+            y = r * size + size / 2 - offset[1]
             points.append((x, y))
-        thickness = 8 if not in_progress else 6
+        thickness = max(2, size * 2 // 15) if not in_progress else max(2, size // 10)
         if len(points) > 1:
             pygame.draw.lines(screen, color, False, points, thickness)
         else:
@@ -131,59 +314,78 @@ class Board:
             (px, py) = points[0]
             pygame.draw.circle(screen, color, (px, py), thickness)
 
-    def _try_add_cell(self, cell):
-        """Attempt to add 'cell' to current path, handle collisions, adjacency, etc."""
-        if not self.current_path:
-            return
-        last_cell = self.current_path[-1]
-        if cell == last_cell:
-            return
+    def _set_owner(self, cell, color):
+        super()._set_owner(cell, color)
+        self._dirty.add(cell)
+
+    def _store_path(self, color, path):
+        # Old and new cells switch between thin and thick strokes
+        self._dirty.update(self.paths[color] or ())
+        self._dirty.update(path or ())
+        for cell in self.paths[color] or ():
+            if self._path_pos.get(cell, (None,))[0] == color:
+                del self._path_pos[cell]
+        for i, cell in enumerate(path or ()):
+            self._path_pos[cell] = (color, i)
+        super()._store_path(color, path)
+        self._path_layer = None
+
+    def _abort_move(self):
+        super()._abort_move()
+        self.mouse_down = False
+        self._motion = []
+
+    def _check_solved(self):
+        was_solved = self.solved
+        super()._check_solved()
+        if self.solved and not was_solved:
+            print("Puzzle solved!")
 
-        # Check adjacency
-        if abs(cell[0] - last_cell[0]) + abs(cell[1] - last_cell[1]) == 1:
-            r, c = cell
-            # If this cell is occupied by a different color, remove that color's path
-            owner = self.cell_owner[r][c]
-            if owner is not None and owner != self.current_color:
-                # Remove that path
-                other_path = self.paths[owner]
-                if other_path:
-                    for (rr, cc) in other_path:
-                        self.cell_owner[rr][cc] = None
-                    self.paths[owner] = None
-
-            # If we've already visited this cell in our path, backtrack
-            if cell in self.current_path:
-                idx = self.current_path.index(cell)
-                self.current_path = self.current_path[:idx+1]
+    def _cells_between(self, start, end):
+        """
+        Cells crossed by the segment between two pointer positions, in order,
+        each sharing a side with the one before (None for cells off the board
+        or out of view). Grid traversal in the style of Amanatides & Woo, on
+        pixel centres.
+        """
+        size = self.cell_size
+        bx0, by0 = self.view.to_board(start)
+        bx1, by1 = self.view.to_board(end)
+        x0, y0 = bx0 + 0.5, by0 + 0.5
+        dx, dy = bx1 - bx0, by1 - by0
+        r, c = by0 // size, bx0 // size
+        r1, c1 = by1 // size, bx1 // size
+        step_r = 1 if dy > 0 else -1
+        step_c = 1 if dx > 0 else -1
+        # Distance along the segment (0..1) to the next row/column boundary, and per cell
+        if dx:
+            next_c = ((c + (dx > 0)) * size - x0) / dx
+            delta_c = size / abs(dx)
+        else:
+            next_c = delta_c = float("inf")
+        if dy:
+            next_r = ((r + (dy > 0)) * size - y0) / dy
+            delta_r = size / abs(dy)
+        else:
+            next_r = delta_r = float("inf")
+
+        cells = []
+        for _ in range(abs(r1 - r) + abs(c1 - c) + 1):
+            inside = 0 <= r < self.height and 0 <= c < self.width and self.view.is_visible(r, c)
+            cells.append((r, c) if inside else None)
+            if r != r1 and (c == c1 or next_r <= next_c):
+                r += step_r
+                next_r += delta_r
             else:
-                self.current_path.append(cell)
+                c += step_c
+                next_c += delta_c
+        return cells
 
-            # Mark ownership
-            for (rr, cc) in self.current_path:
-                self.cell_owner[rr][cc] = self.current_color
+    def _cell_from_mouse(self, pos=None):
+        """Returns (row, col) under pos (default: the mouse) or None if out of bounds."""
+        return self.view.cell_at(pos if pos is not None else pygame.mouse.get_pos())
 
-    def _cell_from_mouse(self):
-        """Returns (row, col) under mouse or None if out of bounds."""
-        x, y = pygame.mouse.get_pos()
-        col = x // self.cell_size
-        row = y // self.cell_size
-        if 0 <= row < self.height and 0 <= col < self.width:
-            return (row, col)
-        return None
 
-    def _check_solved(self):
-        """Set self.solved = True if all colors have valid paths and entire board is filled."""
-        # 1) All colors must have a path
-        for color, path in self.paths.items():
-            if not path:
-                return  # Not solved yet
-
-        # 2) Every cell must be occupied by some color’s path
-        for r in range(self.height):
-            for c in range(self.width):
-                if self.cell_owner[r][c] is None:
-                    return  # Found an unused cell => not solved
-
-        self.solved = True
-        print("Puzzle solved!")
\ No newline at end of file
+
+class CompactBoard(CompactBoardState, Board):
+    """Board drawn and driven like any other, with CompactBoardState's flat ownership arrays."""
@@ -0,0 +1,275 @@
+"""
+Procedural puzzle generator.
+
+    python generator.py 9 9 8 --count 100 --seed 1 --workers 4 > pack.jsonl
+    python generator.py 7 7 6 --count 50 --pack generated.pack
+
+Every puzzle is checked with the solver to have exactly one solution and is
+rated by how much guessing that search needed. Output is one JSON object per
+puzzle: {"level": [h, w, "encoded"], "difficulty": ..., "rating": ..., "seed": ...},
+which levels.read_levels (and so validate_levels.py and level_pack.py) accepts.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from colors import COLOR_MAP
+from level_notation import encode_level
+from solver import Solver
+
+# Branch-count thresholds for the rating labels
+RATINGS = [(1, "easy"), (10, "medium"), (63, "hard")]
+
+# Most cells per color generate() accepts: with longer paths hardly any layout
+# has a unique solution (none on 9x9 with 5 colors), and the search for one
+# goes on for seconds
+CELLS_PER_COLOR = 12
+
+
+class Puzzle:
+    """A generated level plus its difficulty."""
+    def __init__(self, level, difficulty, rating, seed, attempts, elapsed):
+        self.level = level            # [height, width, "encoded"]
+        self.difficulty = difficulty  # log2(1 + solver branch points); 0 = forced moves only
+        self.rating = rating          # "easy", "medium", "hard" or "expert"
+        self.seed = seed
+        self.attempts = attempts      # layouts tried before a unique one turned up
+        self.elapsed = elapsed
+
+    def as_dict(self):
+        return {"level": self.level, "difficulty": self.difficulty, "rating": self.rating,
+                "seed": self.seed}
+
+    def __repr__(self):
+        return "Puzzle(%r, difficulty=%.2f, rating=%r)" % (self.level, self.difficulty, self.rating)
+
+
+def rate(branches):
+    """Map a solver branch count to a rating label."""
+    label = "expert"
+    for limit, name in reversed(RATINGS):
+        if branches <= limit:
+            label = name
+    return label
+
+
+def min_colors(height, width):
+    """The fewest colors generate() accepts for a height x width board."""
+    return math.ceil(height * width / CELLS_PER_COLOR)
+
+
+def _neighbors(height, width):
+    nbrs = []
+    for r in range(height):
+        for c in range(width):
+            cell = []
+            if r > 0:
+                cell.append((r - 1) * width + c)
+            if r < height - 1:
+                cell.append((r + 1) * width + c)
+            if c > 0:
+                cell.append(r * width + c - 1)
+            if c < width - 1:
+                cell.append(r * width + c + 1)
+            nbrs.append(cell)
+    return nbrs
+
+
+def _touches_itself(path, nbrs):
+    """True if two cells of the path are adjacent without being consecutive."""
+    pos = {cell: i for i, cell in enumerate(path)}
+    for i, cell in enumerate(path):
+        for m in nbrs[cell]:
+            j = pos.get(m)
+            if j is not None and abs(i - j) != 1:
+                return True
+    return False
+
+
+def random_layout(height, width, colors, rng):
+    """
+    Cover the grid with exactly `colors` paths that never touch themselves,
+    as a list of cell-index lists, or None if this attempt got stuck.
+
+    Paths are grown one at a time from the most enclosed empty cell, mostly
+    hugging walls and earlier paths, then adjacent path ends are joined (or
+    long paths split) until the count is right.
+    """
+    size = height * width
+    nbrs = _neighbors(height, width)
+    owner = [-1] * size
+    paths = []
+
+    def free(cell):
+        return sum(1 for m in nbrs[cell] if owner[m] < 0)
+
+    # Paths about twice the final average: growth strands short paths that
+    # can't always be joined, while splitting a long one always works
+    target = max(2, 2 * size // colors)
+    empty = set(range(size))
+    while empty:
+        fewest = min(free(cell) for cell in empty)
+        start = rng.choice(sorted(cell for cell in empty if free(cell) == fewest))
+        k = len(paths)
+        path = [start]
+        owner[start] = k
+        empty.discard(start)
+        length = rng.randint(max(2, target // 2), target * 3 // 2 + 1)
+        while len(path) < length:
+            tip = path[-1]
+            steps = [n for n in nbrs[tip] if owner[n] < 0
+                     and not any(owner[m] == k and m != tip for m in nbrs[n])]
+            if not steps:
+                break
+            if rng.random() < 0.8:
+                fewest = min(free(n) for n in steps)
+                steps = [n for n in steps if free(n) == fewest]
+            cell = rng.choice(steps)
+            owner[cell] = k
+            empty.discard(cell)
+            path.append(cell)
+        paths.append(path)
+
+    # Join path ends (single cells first) until there are few enough paths
+    while len(paths) > colors or any(len(p) == 1 for p in paths):
+        order = sorted(range(len(paths)), key=lambda i: (len(paths[i]) > 1, rng.random()))
+        joined = False
+        for i in order:
+            a = paths[i]
+            options = []
+            for j, b in enumerate(paths):
+                if j == i:
+                    continue
+                for aa in (a, a[::-1]):
+                    for bb in (b, b[::-1]):
+                        if bb[0] in nbrs[aa[-1]]:
+                            options.append((j, aa + bb))
+            rng.shuffle(options)
+            for j, merged in options:
+                if not _touches_itself(merged, nbrs):
+                    paths[i] = merged
+                    del paths[j]
+                    joined = True
+                    break
+            if joined:
+                break
+            if len(a) == 1:
+                # Nothing to join: cut a neighbouring path at the cell next to it
+                # and give the loose end this cell instead.
+                cell = a[0]
+                for j, b in enumerate(paths):
+                    for t, x in enumerate(b):
+                        if x not in nbrs[cell]:
+                            continue
+                        for head, rest in ((b[:t + 1], b[t + 1:]), (b[t:][::-1], b[:t])):
+                            if len(rest) >= 2 and not _touches_itself(head + [cell], nbrs):
+                                paths[j] = head + [cell]
+                                paths[i] = rest
+                                joined = True
+                                break
+                        if joined:
+                            break
+                    if joined:
+                        break
+                if joined:
+                    break
+                return None
+        if not joined:
+            return None
+
+    # Too few paths: split the longest ones
+    while len(paths) < colors:
+        longest = max(range(len(paths)), key=lambda i: len(paths[i]))
+        path = paths[longest]
+        if len(path) < 4:
+            return None
+        cut = rng.randint(2, len(path) - 2)
+        paths[longest] = path[:cut]
+        paths.append(path[cut:])
+    return paths
+
+
+def generate(height, width, colors, seed=None, max_attempts=1000, node_limit=5000):
+    """
+    Generate a height x width puzzle with `colors` colors and a unique
+    solution. The same seed always yields the same puzzle. colors must be
+    at least min_colors(height, width); layouts the solver can't settle
+    within node_limit nodes are skipped.
+    """
+    letters = list(COLOR_MAP)
+    if not 1 <= colors <= len(letters):
+        raise ValueError("colors must be between 1 and %d" % len(letters))
+    if 2 * colors > height * width:
+        raise ValueError("a %dx%d board cannot hold %d colors" % (height, width, colors))
+    if colors < min_colors(height, width):
+        raise ValueError("a %dx%d puzzle needs at least %d colors; with fewer, almost no layout "
+                         "has a unique solution" % (height, width, min_colors(height, width)))
+
+    start = time.perf_counter()
+    rng = random.Random(seed)
+    for attempt in range(1, max_attempts + 1):
+        paths = random_layout(height, width, colors, rng)
+        if paths is None:
+            continue
+        grid = [[None] * width for _ in range(height)]
+        for letter, path in zip(letters, paths):
+            for cell in (path[0], path[-1]):
+                grid[cell // width][cell % width] = letter
+
+        result = Solver(height, width, grid).solve(max_solutions=2, node_limit=node_limit)
+        if not result.unique:
+            continue
+        return Puzzle(encode_level(grid), round(math.log2(1 + result.branches), 2),
+                      rate(result.branches), seed, attempt, time.perf_counter() - start)
+    raise RuntimeError("no unique %dx%d puzzle with %d colors after %d attempts"
+                       % (height, width, colors, max_attempts))
+
+
+def _generate_job(job):
+    return generate(*job)
+
+
+def generate_many(count, height, width, colors, seed=0, workers=None):
+    """
+    Generate `count` puzzles in worker processes, yielding them in order.
+    Puzzle i uses seed + i, so a run is reproducible whatever the worker count.
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = [(height, width, colors, seed + i) for i in range(count)]
+    if workers == 1:
+        yield from map(_generate_job, jobs)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap(_generate_job, jobs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate puzzles with unique solutions.")
+    parser.add_argument("height", type=int)
+    parser.add_argument("width", type=int)
+    parser.add_argument("colors", type=int)
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first puzzle")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--pack", help="also write the levels to this binary .pack file")
+    args = parser.parse_args(argv)
+
+    levels = []
+    for puzzle in generate_many(args.count, args.height, args.width, args.colors,
+                                args.seed, args.workers):
+        print(json.dumps(puzzle.as_dict()), flush=True)
+        if args.pack:
+            levels.append(puzzle.level)
+    if args.pack:
+        from level_pack import write_pack
+        write_pack(args.pack, levels)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
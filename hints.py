@@ -0,0 +1,181 @@
+import threading
+import time
+import traceback
+from collections import OrderedDict
+
+from solver import Solver
+
+_TIMEOUT = object()  # returned internally when a search ran out of its time budget
+
+
+class Hint:
+    """A path the player should draw next."""
+    def __init__(self, color, cells, kind):
+        self.color = color
+        self.cells = cells    # full endpoint-to-endpoint path, list of (row, col)
+        self.kind = kind      # "extend": finish the path being drawn
+                              # "path":   draw this color, nothing needs undoing
+                              # "fix":    an existing path is wrong, replace it
+
+    def __repr__(self):
+        return "Hint(%r, %s, %d cells)" % (self.color, self.kind, len(self.cells))
+
+
+class _Snapshot:
+    """The parts of a Board a hint needs, copied so a worker thread can't see later moves."""
+    def __init__(self, board):
+        self.height = board.height
+        self.width = board.width
+        self.grid = board.grid
+        self.endpoints = board.endpoints
+        self.paths = {color: list(path) for color, path in board.paths.items() if path}
+        self.current_color = board.current_color
+        self.current_path = list(board.current_path)
+        self.key = (board.height, board.width, tuple(tuple(row) for row in board.grid))
+        # Everything a hint depends on, so identical requests can be recognised
+        self.state = (self.key, tuple(sorted((color, tuple(path)) for color, path in self.paths.items())),
+                      self.current_color, tuple(self.current_path))
+
+
+def _same_path(path, other):
+    return path == other or path == other[::-1]
+
+
+def _is_prefix(partial, path):
+    """True if partial is the start of path, walked from either endpoint."""
+    n = len(partial)
+    return partial == path[:n] or partial == path[::-1][:n]
+
+
+class HintEngine:
+    """
+    Hints from the player's current state.
+
+    The full solution of the most recent levels is cached. While every path
+    the player has stored (and the one being drawn) agrees with it, a hint is
+    a lookup. Otherwise the remaining colors are re-solved around the
+    player's paths; if that is impossible, the hint is to replace the first
+    wrong path. Hints that need longer searches are worked out one at a time
+    on a single worker thread.
+    """
+    def __init__(self, budget=0.016, background_limit=10.0, max_levels=32):
+        self.budget = budget                      # seconds hint() may search on the calling thread
+        self.background_limit = background_limit  # seconds the worker may search for one hint
+        self.max_levels = max_levels              # solutions cached, least recently used dropped first
+        self._solutions = OrderedDict()           # level key -> full solution (color -> path)
+        self._lock = threading.Lock()
+        self._work_ready = threading.Condition()
+        self._wanted = None    # (snapshot, callback) the worker should answer next
+        self._working = None   # (state, callback) of the request the worker is answering
+        self._thread = None
+
+    def hint(self, board, callback=None):
+        """
+        Return the next Hint for board, or None if it's solved or has no solution.
+
+        If the answer takes longer than the budget and a callback is given, the
+        search continues on the worker thread, callback(hint) is called from
+        that thread when done (with None if background_limit ran out), and
+        hint() returns None straight away. The worker only takes the latest
+        request, and one for the board state it is already searching just
+        redirects that answer to the new callback.
+        """
+        snap = _Snapshot(board)
+        result = self._compute(snap, time.perf_counter() + self.budget)
+        if result is not _TIMEOUT:
+            return result
+        if callback is None:
+            return self._compute(snap, None)
+
+        with self._work_ready:
+            if self._working is not None and self._working[0] == snap.state:
+                self._working = (snap.state, callback)
+                return None
+            self._wanted = (snap, callback)
+            self._work_ready.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, daemon=True)
+                self._thread.start()
+        return None
+
+    def solution(self, board):
+        """Cached full solution for board's level (color -> path), or None."""
+        return self._solution(_Snapshot(board), None)
+
+    def _work(self):
+        while True:
+            with self._work_ready:
+                while self._wanted is None:
+                    self._work_ready.wait()
+                snap, callback = self._wanted
+                self._wanted = None
+                self._working = (snap.state, callback)
+            try:
+                result = self._compute(snap, time.perf_counter() + self.background_limit)
+            except Exception:
+                # A bug in one search mustn't stop hints for the rest of the session
+                traceback.print_exc()
+                result = None
+            with self._work_ready:
+                callback = self._working[1]
+                self._working = None
+            callback(None if result is _TIMEOUT else result)
+
+    def _solution(self, snap, deadline):
+        with self._lock:
+            if snap.key in self._solutions:
+                self._solutions.move_to_end(snap.key)
+                return self._solutions[snap.key]
+        try:
+            result = Solver(snap.height, snap.width, snap.grid).solve(deadline=deadline)
+        except ValueError:
+            paths = None  # malformed level, e.g. a color without two endpoints
+        else:
+            if not result.complete and not result.solved:
+                return _TIMEOUT
+            paths = result.paths
+        with self._lock:
+            self._solutions[snap.key] = paths
+            if len(self._solutions) > self.max_levels:
+                self._solutions.popitem(last=False)
+        return paths
+
+    def _compute(self, snap, deadline):
+        """The hint for snap, or _TIMEOUT; deadline (a time.perf_counter() value) covers every search."""
+        solution = self._solution(snap, deadline)
+        if solution is _TIMEOUT:
+            return _TIMEOUT
+        if solution is None:
+            return None
+
+        if all(_same_path(path, solution[color]) for color, path in snap.paths.items()):
+            # Consistent with the cached solution: carry on the drag, then the shortest missing path
+            if (snap.current_color is not None and snap.current_color not in snap.paths
+                    and _is_prefix(snap.current_path, solution[snap.current_color])):
+                return Hint(snap.current_color, solution[snap.current_color], "extend")
+            missing = [color for color in snap.endpoints if color not in snap.paths]
+            if not missing:
+                return None
+            color = min(missing, key=lambda c: len(solution[c]))
+            return Hint(color, solution[color], "path")
+
+        # The player went another way; see if the rest can still be solved around it
+        try:
+            result = Solver(snap.height, snap.width, snap.grid).solve(
+                fixed=snap.paths, deadline=deadline)
+        except ValueError:
+            result = None
+        if result is not None and not result.solved and not result.complete:
+            return _TIMEOUT
+        if result is not None and result.solved:
+            missing = [color for color in snap.endpoints if color not in snap.paths]
+            if not missing:
+                return None  # every color drawn: a valid alternative solution
+            color = min(missing, key=lambda c: len(result.paths[c]))
+            return Hint(color, result.paths[color], "path")
+
+        for color, path in snap.paths.items():
+            if not _same_path(path, solution[color]):
+                return Hint(color, solution[color], "fix")
+        return None
+
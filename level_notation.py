@@ -1,46 +1,146 @@
+import re
+from functools import lru_cache
+
+import colors
 from colors import COLOR_MAP
 
-def parse_level(level_data):
+# A run of digits = that many empty cells, any other character = one endpoint.
+_TOKEN = re.compile(r"\d+|\D")
+
+# parse_level(letters=True) maps through this instead of COLOR_MAP
+_SAME_LETTER = {letter: letter for letter in COLOR_MAP}
+
+
+def decode_cells(encoded, limit=None, color_map=None, strict=False):
+    """
+    Decode an encoded string into a flat list of cells, None for empty ones.
+    Endpoint characters are looked up in color_map, or kept as they are
+    without one; characters missing from it raise ValueError if strict and
+    decode to None otherwise. Decoding stops once more than `limit` cells
+    exist, so a bogus huge run count can't allocate unbounded memory.
+    """
+    cells = []
+    append = cells.append
+    for token in _TOKEN.findall(encoded):
+        if color_map is not None and token in color_map:
+            append(color_map[token])
+        elif token.isdecimal():
+            n = int(token)
+            if limit is not None and n > limit:
+                n = limit + 1
+            cells += [None] * n
+            if limit is not None and len(cells) > limit:
+                break
+        elif color_map is None:
+            append(token)
+        elif strict:
+            raise ValueError("unknown color letter %r" % token)
+        else:
+            append(None)
+    return cells
+
+
+@lru_cache(maxsize=1024)
+def _parse_rows(encoded, height, width, strict, letters, version):
+    """
+    Cached decode to a tuple of `height` row tuples. version is the color
+    scheme's (None for letters, which don't depend on it), so entries made
+    under another scheme are never returned.
+    """
+    size = height * width
+    cells = decode_cells(encoded, size, _SAME_LETTER if letters else COLOR_MAP, strict)
+    if len(cells) != size:
+        if strict:
+            raise ValueError("level decodes to %s cells, expected %d x %d = %d"
+                             % ("more than %d" % size if len(cells) > size else len(cells),
+                                height, width, size))
+        # Pad short strings and drop extra cells so the grid always has `height` rows
+        cells += [None] * (size - len(cells))
+        del cells[size:]
+    return tuple([tuple(cells[i:i + width]) for i in range(0, size, width)])
+
+
+def parse_level(level_data, strict=False, flat=False, letters=False):
     """
     Parses a level given in the form [height, width, "encoded_string"].
       - A number in the string = that many empty cells (None).
       - A letter in the string = an endpoint cell of that color.
-    Returns (height, width, grid), where grid is a 2D list of size [height][width].
+    Returns (height, width, grid), where grid is a 2D list of size [height][width]
+    (or one flat list of height * width cells if flat=True). Cells hold
+    (R, G, B) colors from COLOR_MAP, or the color letters if letters=True.
+
+    By default short strings are padded and extra cells dropped; strict=True
+    raises ValueError instead, and also for letters missing from COLOR_MAP.
+    Results are cached per (string, size, color scheme), so re-parsing a
+    level, e.g. on restart, costs one copy of the grid.
     """
     height, width, encoded = level_data
-    cells = []
-    row = []
-    i = 0
-
-    while i < len(encoded):
-        ch = encoded[i]
-        if ch.isdigit():
-            # Build up the entire number (could be multiple digits)
-            num_str = ""
-            while i < len(encoded) and encoded[i].isdigit():
-                num_str += encoded[i]
-                i += 1
-            count = int(num_str)
-            for _ in range(count):
-                row.append(None)
-                if len(row) == width:
-                    cells.append(row)
-                    row = []
-        else:
-            # A single letter => an endpoint of that color
-            color = COLOR_MAP.get(ch, None)
-            row.append(color)
-            i += 1
-            if len(row) == width:
-                cells.append(row)
-                row = []
+    rows = _parse_rows(encoded, height, width, strict, letters,
+                       None if letters else colors.scheme_version)
+    if flat:
+        return height, width, [cell for row in rows for cell in row]
+    return height, width, [list(row) for row in rows]
+
+
+def parse_level_array(level_data, strict=False):
+    """
+    Like parse_level, but returns (height, width, ids) with ids a NumPy int8
+    array of shape (height, width): 0 for empty cells, otherwise 1 + the
+    color's position in COLOR_MAP. Requires numpy.
+    """
+    import numpy as np
+
+    height, width, encoded = level_data
+    # By letter: two letters may share an RGB value in some schemes
+    ids = {letter: i + 1 for i, letter in enumerate(COLOR_MAP)}
+    ids[None] = 0
+    rows = _parse_rows(encoded, height, width, strict, True, None)
+    flat = np.fromiter((ids[c] for row in rows for c in row), dtype=np.int8, count=height * width)
+    return height, width, flat.reshape(height, width)
 
-    # If row is partially filled, pad it
-    if row:
-        while len(row) < width:
-            row.append(None)
-        cells.append(row)
 
-    return height, width, cells
+parse_cache_info = _parse_rows.cache_info
+parse_cache_clear = _parse_rows.cache_clear
 
 
+def encode_level(grid):
+    """
+    Inverse of parse_level: turns a grid (rows of color letters, (R, G, B)
+    colors from COLOR_MAP, or None) into [height, width, "encoded_string"].
+    An RGB color that several letters share in the active scheme can't be
+    told apart and raises ValueError; grids of letters always encode.
+    """
+    letter_for = {}
+    shared = set()
+    for letter, color in COLOR_MAP.items():
+        if color in letter_for:
+            shared.add(color)
+        letter_for.setdefault(color, letter)
+    height = len(grid)
+    width = len(grid[0]) if height else 0
+    parts = []
+    run = 0
+    for row in grid:
+        if len(row) != width:
+            raise ValueError("grid rows must all have the same length")
+        for cell in row:
+            if cell is None:
+                run += 1
+                continue
+            if run:
+                parts.append(str(run))
+                run = 0
+            if isinstance(cell, str):
+                if len(cell) != 1 or cell.isdigit():
+                    raise ValueError("invalid color letter %r" % (cell,))
+                parts.append(cell)
+            elif cell in shared:
+                raise ValueError("color %r belongs to more than one letter in this scheme; "
+                                 "encode a grid of letters instead" % (cell,))
+            elif cell in letter_for:
+                parts.append(letter_for[cell])
+            else:
+                raise ValueError("color %r is not in COLOR_MAP" % (cell,))
+    if run:
+        parts.append(str(run))
+    return [height, width, "".join(parts)]
@@ -0,0 +1,151 @@
+"""
+Binary level packs, opened with mmap so only the requested level is decoded.
+
+Layout (little-endian):
+    header   b"FLWP", u16 version, u16 reserved, u32 count
+    index    (count + 1) u32 byte offsets; record i spans index[i]:index[i+1]
+    records  u16 height, u16 width, then RLE cell bytes:
+               0x00-0x7F  an endpoint, the byte is the color letter
+               0x80-0xFF  a run of (byte - 0x7F) empty cells, 1..128
+
+Convert an existing pack with:
+    python level_pack.py levels.py levels.pack
+"""
+import mmap
+import struct
+import sys
+
+MAGIC = b"FLWP"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHI")
+_OFFSET = struct.Struct("<I")
+_DIMS = struct.Struct("<HH")
+_MAX_RUN = 128
+
+
+def encode_record(level_data):
+    """Pack one [height, width, "encoded"] entry into record bytes."""
+    height, width, encoded = level_data
+    out = bytearray(_DIMS.pack(height, width))
+    i = 0
+    while i < len(encoded):
+        ch = encoded[i]
+        if ch.isdigit():
+            j = i
+            while j < len(encoded) and encoded[j].isdigit():
+                j += 1
+            run = int(encoded[i:j])
+            while run > 0:
+                n = min(run, _MAX_RUN)
+                out.append(0x7F + n)
+                run -= n
+            i = j
+        else:
+            code = ord(ch)
+            if code >= 0x80:
+                raise ValueError("color letter %r is not ASCII" % ch)
+            out.append(code)
+            i += 1
+    return bytes(out)
+
+
+def decode_record(buf, start=0, end=None):
+    """Inverse of encode_record: returns [height, width, "encoded"]."""
+    if end is None:
+        end = len(buf)
+    height, width = _DIMS.unpack_from(buf, start)
+    parts = []
+    run = 0
+    for b in buf[start + _DIMS.size:end]:
+        if b >= 0x80:
+            run += b - 0x7F
+        else:
+            if run:
+                parts.append(str(run))
+                run = 0
+            parts.append(chr(b))
+    if run:
+        parts.append(str(run))
+    return [height, width, "".join(parts)]
+
+
+def write_pack(path, entries):
+    """Write entries ([h, w, "encoded"] lists) to a pack file."""
+    records = [encode_record(entry) for entry in entries]
+    offset = _HEADER.size + _OFFSET.size * (len(records) + 1)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, len(records)))
+        for rec in records:
+            f.write(_OFFSET.pack(offset))
+            offset += len(rec)
+        f.write(_OFFSET.pack(offset))
+        for rec in records:
+            f.write(rec)
+
+
+class LevelPack:
+    """
+    Read-only, memory-mapped view of a pack file. Opening reads only the
+    header; pack[i] decodes just record i, so startup cost does not depend
+    on the number of levels.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError("%s: empty file is not a level pack" % path)
+        magic, version, _, self._count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("%s: not a level pack" % path)
+        if version != VERSION:
+            self.close()
+            raise ValueError("%s: unsupported pack version %d" % (path, version))
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("level index out of range")
+        start, end = struct.unpack_from("<2I", self._mm, _HEADER.size + _OFFSET.size * index)
+        return decode_record(self._mm, start, end)
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    from levels import read_levels
+
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 2:
+        print("usage: python level_pack.py SOURCE(.py|.json|.jsonl) OUTPUT.pack", file=sys.stderr)
+        return 2
+    source, output = args
+    entries = list(read_levels(source))
+    write_pack(output, entries)
+    print("wrote %d levels to %s" % (len(entries), output))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
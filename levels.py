@@ -1,7 +1,72 @@
+import json
+import os
+import runpy
+
 LEVELS = [
     [6, 5, "1d2a4b2b1c2c10da"], # The example from the original code
 ]
 
+# A binary pack next to this file replaces LEVELS when present (see level_pack.py).
+DEFAULT_PACK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels.pack")
+
+_pack = None    # the open LevelPack, if any
+_levels = None  # what get_level reads: LEVELS or _pack, decided on first use
+
+
+def load_pack(path=DEFAULT_PACK):
+    """Switch get_level over to a memory-mapped level pack."""
+    global _pack, _levels
+    from level_pack import LevelPack
+    if _pack is not None:
+        _pack.close()
+    _pack = _levels = LevelPack(path)
+    return _pack
+
+
+def _active_levels():
+    global _levels
+    if _levels is None:
+        # Looked for once; later packs come in through load_pack()
+        if os.path.exists(DEFAULT_PACK):
+            load_pack(DEFAULT_PACK)
+        else:
+            _levels = LEVELS
+    return _levels
+
+
+def level_count():
+    return len(_active_levels())
+
+
 def get_level(index=0):
     """Return a level from the list by index (wrap if out of range)."""
-    return LEVELS[index % len(LEVELS)]
+    levels = _active_levels()
+    return levels[index % len(levels)]
+
+
+def _entry(item):
+    # generator.py writes {"level": [...], "difficulty": ...} objects
+    return item["level"] if isinstance(item, dict) and "level" in item else item
+
+
+def read_levels(path):
+    """
+    Yield [height, width, "encoded"] entries from a .py (LEVELS), .json, .pack
+    or JSON-lines file. JSON entries may also be objects with a "level" field,
+    as generator.py writes them.
+    """
+    if path.endswith(".py"):
+        yield from runpy.run_path(path)["LEVELS"]
+    elif path.endswith(".pack"):
+        from level_pack import LevelPack
+        with LevelPack(path) as pack:
+            yield from pack
+    elif path.endswith(".json"):
+        with open(path) as f:
+            yield from map(_entry, json.load(f))
+    else:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield _entry(json.loads(line))
@@ -1,56 +1,127 @@
+import time
+_started = time.perf_counter()  # startup is reported from here to the first frame
+
+import os
 import pygame
 import sys
-from screens import SplashScreen, MainMenuScreen, GameScreen, LevelCompletionScreen, ColorSchemeScreen
+from screens import (SplashScreen, MainMenuScreen, LevelSelectScreen, GameScreen,
+                     LevelCompletionScreen, ColorSchemeScreen)
 import colors  # our colors.py module
+from profiler import FrameProfiler
 
 def apply_scheme_callback(scheme):
-    # Update the global color mapping in colors.py.
-    # This assumes your game uses colors.COLOR_MAP during level parsing.
-    colors.COLOR_MAP.clear()
-    colors.COLOR_MAP.update(scheme)
+    # Update the global color mapping in colors.py. Boards keep color letters
+    # and notice the change the next time they draw.
+    colors.set_scheme(scheme)
     print("Applied color scheme:", scheme)
 
 def main():
-    pygame.init()
+    imported = time.perf_counter()
+    # Only what the game uses: pygame.init() would also bring up audio,
+    # joystick and the rest, which costs startup time for nothing
+    pygame.display.init()
+    pygame.font.init()
     screen = pygame.display.set_mode((400, 500))
     pygame.display.set_caption("Flow Free Clone")
     
     current_screen = None
 
+    # Screens are built on first visit and reused; enter() resets them for later visits
+    factories = {
+        "splash": lambda extra: SplashScreen(switch_screen),
+        "main_menu": lambda extra: MainMenuScreen(switch_screen),
+        "level_select": lambda extra: LevelSelectScreen(switch_screen),
+        # extra: level data or a level index to play; None resumes the current level
+        "game": lambda extra: GameScreen(switch_screen, level_data=extra),
+        "level_complete": lambda extra: LevelCompletionScreen(switch_screen, extra),
+        # Pass the apply_scheme_callback so that scheme changes take effect instantly.
+        "color_scheme": lambda extra: ColorSchemeScreen(switch_screen, apply_scheme_callback),
+    }
+    screens = {}
+
     def switch_screen(screen_name, extra=None):
         nonlocal current_screen
-        if screen_name == "splash":
-            current_screen = SplashScreen(switch_screen)
-        elif screen_name == "main_menu":
-            current_screen = MainMenuScreen(switch_screen)
-        elif screen_name == "game":
-            # Pass level data (extra) if provided; otherwise, use default.
-            current_screen = GameScreen(switch_screen, level_data=extra)
-        elif screen_name == "level_complete":
-            current_screen = LevelCompletionScreen(switch_screen, board=extra)
-        elif screen_name == "color_scheme":
-            # Pass the apply_scheme_callback so that scheme changes take effect instantly.
-            current_screen = ColorSchemeScreen(switch_screen, apply_scheme_callback)
+        screen = screens.get(screen_name)
+        if screen is None:
+            screen = screens[screen_name] = factories[screen_name](extra)
+        else:
+            screen.enter(extra)
+        current_screen = screen
     
     switch_screen("splash")
 
+    # Off unless FLOW_PROFILE or FLOW_TRACE is set; see profiler.py
+    profiler = FrameProfiler.from_env()
+
+    initialized = time.perf_counter()
+    first_frame = True
+    # Benchmarks (bench_startup.py) set this to quit once the first frame is up
+    exit_after_first_frame = bool(os.environ.get("FLOW_STARTUP_EXIT"))
+
     clock = pygame.time.Clock()
     running = True
     while running:
-        dt = clock.tick(30) / 1000.0  # ~30 FPS
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+        fps = current_screen.frame_rate() if current_screen else 0
+        if fps:
+            dt = clock.tick(fps) / 1000.0
+            events = pygame.event.get()
+        elif current_screen and current_screen.dirty:
+            # Already something to draw (e.g. the first frame): don't sleep first
+            events = pygame.event.get()
+            dt = clock.tick() / 1000.0
+        else:
+            # Nothing animating: sleep until input arrives or the screen's timer is due
+            timeout = current_screen.timeout() if current_screen else None
+            if timeout is None:
+                events = [pygame.event.wait()]
             else:
-                if current_screen:
+                events = [pygame.event.wait(max(1, int(timeout * 1000)))]
+            events += pygame.event.get()
+            dt = clock.tick() / 1000.0  # includes the time spent waiting
+
+        with profiler.phase(current_screen, "event"):
+            for event in events:
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.NOEVENT:
+                    continue
+                elif profiler.handle_event(event):
+                    if current_screen:
+                        current_screen.dirty = True
+                elif current_screen:
                     current_screen.handle_event(event)
-        
+
         if current_screen:
-            current_screen.update(dt)
-            current_screen.draw(screen)
-        
-        pygame.display.flip()
-    
+            with profiler.phase(current_screen, "update"):
+                current_screen.update(dt)
+        if not current_screen or not current_screen.dirty:
+            continue
+        current_screen.dirty = False
+
+        erased = profiler.erase_overlay(screen)
+        with profiler.phase(current_screen, "draw"):
+            dirty = current_screen.draw(screen)
+        overlay = profiler.draw_overlay(screen, current_screen)
+
+        # Screens that track their own changes return dirty rects; others get a full flip
+        with profiler.phase(current_screen, "flip"):
+            if dirty is None:
+                pygame.display.flip()
+            else:
+                dirty = dirty + [rect for rect in (erased, overlay) if rect]
+                if dirty:
+                    pygame.display.update(dirty)
+
+        if first_frame:
+            first_frame = False
+            now = time.perf_counter()
+            print("Startup: %.0f ms to first frame (imports %.0f ms, init %.0f ms)"
+                  % ((now - _started) * 1000, (imported - _started) * 1000,
+                     (initialized - imported) * 1000))
+            if exit_after_first_frame:
+                running = False
+
+    profiler.close()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,46 @@
+import threading
+
+from game import Board
+
+
+class BoardPreloader:
+    """
+    Builds a level's Board on a worker thread ahead of time: the grid parsed
+    and the cached layers rendered, so switching to it costs nothing on the
+    main thread. Only the latest request is kept.
+    """
+    def __init__(self, cell_size=60, view_rect=None):
+        self.cell_size = cell_size
+        self.view_rect = view_rect
+        self._jobs = {}  # key -> (thread, result list holding the Board once built)
+        self._lock = threading.Lock()
+
+    def _key(self, level_data):
+        return tuple(level_data)
+
+    def request(self, level_data):
+        """Start building a Board for level_data unless one is already on the way."""
+        key = self._key(level_data)
+        with self._lock:
+            if key in self._jobs:
+                return
+            result = []
+
+            def work():
+                board = Board(level_data, cell_size=self.cell_size, view_rect=self.view_rect)
+                board.prerender()
+                result.append(board)
+
+            thread = threading.Thread(target=work, daemon=True)
+            self._jobs = {key: (thread, result)}
+            thread.start()
+
+    def take(self, level_data):
+        """The preloaded Board for level_data (waiting for it if still building), or None."""
+        with self._lock:
+            job = self._jobs.pop(self._key(level_data), None)
+        if job is None:
+            return None
+        thread, result = job
+        thread.join()
+        return result[0] if result else None
@@ -0,0 +1,166 @@
+"""
+Optional per-frame profiling for the main loop.
+
+    FLOW_PROFILE=1 python main.py              # F3 toggles the frame-time overlay
+    FLOW_TRACE=trace.json python main.py       # same, plus a Chrome trace on exit
+
+Each frame the loop times its phases (event, update, draw, flip) under the
+current screen's class name. The last `history` samples of every
+(screen, phase) pair are kept for the overlay and histograms; with a trace
+path every phase is also recorded as a Chrome "complete" event, viewable in
+chrome://tracing or Perfetto. When profiling is off, phase() hands back a
+shared no-op context and nothing is recorded.
+"""
+import contextlib
+import json
+import os
+import time
+from collections import deque
+
+import pygame
+from fonts import get_font
+
+PHASES = ("event", "update", "draw", "flip")
+BUCKETS = (1, 2, 4, 8, 16, 33, 66)  # histogram upper edges in ms; the last bucket is open
+MAX_TRACE_EVENTS = 500000           # about 50 MB of JSON, or ~35 minutes at 60 FPS
+
+_NULL = contextlib.nullcontext()
+
+
+class _Phase:
+    """Times one phase of a frame; a class rather than @contextmanager to keep it cheap."""
+    __slots__ = ("profiler", "screen", "name", "start")
+
+    def __init__(self, profiler, screen, name):
+        self.profiler = profiler
+        self.screen = screen
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.screen, self.name, self.start, time.perf_counter())
+
+
+class FrameProfiler:
+    def __init__(self, enabled=False, trace_path=None, history=240, budget=1 / 30):
+        self.enabled = enabled or trace_path is not None
+        self.trace_path = trace_path
+        self.history = history
+        self.budget = budget              # seconds per frame before a phase is flagged
+        self.samples = {}                 # (screen, phase) -> deque of durations in seconds
+        self.trace = []                   # Chrome trace events, only kept with a trace_path
+        self.overlay = False
+        self._origin = time.perf_counter()
+        self._under = None                # (rect, surface) the overlay last covered
+
+    @classmethod
+    def from_env(cls):
+        """FLOW_TRACE=path enables profiling with a trace; FLOW_PROFILE=1 without."""
+        trace_path = os.environ.get("FLOW_TRACE") or None
+        return cls(enabled=bool(os.environ.get("FLOW_PROFILE")), trace_path=trace_path)
+
+    def phase(self, screen, name):
+        """Context manager timing one phase of the frame for the given screen object."""
+        if not self.enabled:
+            return _NULL
+        return _Phase(self, type(screen).__name__, name)
+
+    def record(self, screen, name, start, end):
+        key = (screen, name)
+        window = self.samples.get(key)
+        if window is None:
+            window = self.samples[key] = deque(maxlen=self.history)
+        window.append(end - start)
+        if self.trace_path is not None and len(self.trace) < MAX_TRACE_EVENTS:
+            self.trace.append({"name": name, "cat": screen, "ph": "X", "pid": 0, "tid": 0,
+                               "ts": round((start - self._origin) * 1e6, 1),
+                               "dur": round((end - start) * 1e6, 1)})
+
+    def histogram(self, screen, name):
+        """Counts of the recent samples per BUCKETS edge (plus one for slower ones)."""
+        counts = [0] * (len(BUCKETS) + 1)
+        for seconds in self.samples.get((screen, name), ()):
+            ms = seconds * 1000
+            i = 0
+            while i < len(BUCKETS) and ms > BUCKETS[i]:
+                i += 1
+            counts[i] += 1
+        return counts
+
+    def stats(self, screen, name):
+        """(p50, p95, max) of the recent samples in ms, or None if there are none."""
+        window = sorted(self.samples.get((screen, name), ()))
+        if not window:
+            return None
+        n = len(window)
+        return (window[n // 2] * 1000, window[min(n - 1, n * 95 // 100)] * 1000, window[-1] * 1000)
+
+    # --- Overlay ----------------------------------------------------------
+
+    def handle_event(self, event):
+        """Returns True if the event was the overlay hotkey (F3)."""
+        if self.enabled and event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.overlay = not self.overlay
+            return True
+        return False
+
+    def erase_overlay(self, surface):
+        """Put back what the last overlay covered; returns that rect or None."""
+        if self._under is None:
+            return None
+        rect, under = self._under
+        self._under = None
+        surface.blit(under, rect)
+        return rect
+
+    def draw_overlay(self, surface, screen):
+        """Draw recent frame times for screen in the top-right corner; returns its rect."""
+        if not self.overlay:
+            return None
+        name = type(screen).__name__
+        font = get_font(None, 18)
+        lines = [(name, (255, 255, 255))]
+        for phase in PHASES:
+            stats = self.stats(name, phase)
+            if stats is None:
+                continue
+            p50, p95, worst = stats
+            color = (255, 80, 80) if worst > self.budget * 1000 else (200, 200, 200)
+            lines.append(("%-6s p50 %5.1f p95 %5.1f max %5.1f ms" % (phase, p50, p95, worst), color))
+        # Numbers change every frame, so render directly instead of filling the text cache
+        surfs = [font.render(text, True, color) for text, color in lines]
+        width = max(s.get_width() for s in surfs) + 8
+        height = sum(s.get_height() for s in surfs) + 8
+        rect = pygame.Rect(surface.get_width() - width, 0, width, height).clip(surface.get_rect())
+        self._under = (rect, surface.subsurface(rect).copy())
+        surface.fill((0, 0, 0), rect)
+        y = rect.y + 4
+        for s in surfs:
+            surface.blit(s, (rect.x + 4, y))
+            y += s.get_height()
+        return rect
+
+    # --- Output -----------------------------------------------------------
+
+    def summary(self):
+        """One line per (screen, phase): recent p50/p95/max and histogram."""
+        lines = []
+        for screen, phase in sorted(self.samples):
+            p50, p95, worst = self.stats(screen, phase)
+            lines.append("%-22s %-6s p50 %6.2f p95 %6.2f max %7.2f ms  hist %s"
+                         % (screen, phase, p50, p95, worst, self.histogram(screen, phase)))
+        return "\n".join(lines)
+
+    def close(self):
+        """Print the summary and write the trace file, if profiling was on."""
+        if not self.enabled:
+            return
+        if self.samples:
+            print("Frame phases (last %d frames, histogram edges %s ms):" % (self.history, list(BUCKETS)))
+            print(self.summary())
+        if self.trace_path is not None:
+            with open(self.trace_path, "w") as f:
+                json.dump({"traceEvents": self.trace, "displayTimeUnit": "ms"}, f)
+            print("Wrote %d trace events to %s" % (len(self.trace), self.trace_path))
@@ -1,20 +1,75 @@
+import threading
+
 import pygame
 from button import Button
+from fonts import get_font, render_text
 from game import Board
-from levels import get_level
+from hints import HintEngine
+from level_notation import parse_level
+from levels import get_level, level_count
+from preload import BoardPreloader
+from thumbnails import ThumbnailAtlas
+
+# Shared so solutions cached for a level survive restarts and new GameScreens
+hint_engine = HintEngine()
+# Screen area boards are fitted into (the buttons sit below it); wheel or +/- zooms,
+# right-drag or the arrow keys scroll boards that don't fit
+BOARD_RECT = (0, 0, 400, 390)
+
+# Builds the next level's Board while the level-complete screen is up
+preloader = BoardPreloader(cell_size=60, view_rect=BOARD_RECT)
+
+# Level previews for LevelSelectScreen, kept across visits (and on disk between runs)
+thumbnail_atlas = ThumbnailAtlas()
+
+# Posted from worker threads to wake main's event loop when it is idle
+WAKE = pygame.event.custom_type()
+
+# Events after which a screen without its own change tracking redraws
+_REDRAW_EVENTS = {pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.KEYDOWN,
+                  pygame.VIDEOEXPOSE, WAKE}
+
+
+def wake_main_loop():
+    """Safe to call from any thread."""
+    if pygame.display.get_init():
+        pygame.event.post(pygame.event.Event(WAKE))
+
 
 class BaseScreen:
     def __init__(self):
         self.buttons = []
+        self.dirty = True  # main only calls draw() while this is set
+
+    def enter(self, extra=None):
+        """
+        Called when main switches to an already-built screen, with the same
+        extra a new one would get; screens reset whatever a visit changes.
+        """
+        self.dirty = True
+
+    def frame_rate(self):
+        """Frames per second this screen needs right now; 0 = only redraw after events."""
+        return 0
+
+    def timeout(self):
+        """Seconds until update() must run even without input, or None to just wait for events."""
+        return None
 
     def update(self, dt):
         pass
 
     def draw(self, surface):
+        """
+        Draw the screen. Returns a list of changed rects for
+        pygame.display.update, or None if the whole surface should be flipped.
+        """
         for btn in self.buttons:
             btn.draw(surface)
 
     def handle_event(self, event):
+        if event.type in _REDRAW_EVENTS:
+            self.dirty = True
         for btn in self.buttons:
             btn.handle_event(event)
 
@@ -23,7 +78,10 @@ class SplashScreen(BaseScreen):
         super().__init__()
         self.switch_screen_callback = switch_screen_callback
         self.time_elapsed = 0
-        self.logo_font = pygame.font.SysFont(None, 72)
+        self.logo_font = get_font(None, 72)
+
+    def timeout(self):
+        return max(0, 2 - self.time_elapsed)
 
     def update(self, dt):
         self.time_elapsed += dt
@@ -32,7 +90,7 @@ class SplashScreen(BaseScreen):
 
     def draw(self, surface):
         surface.fill((0, 0, 0))
-        text = self.logo_font.render("Flow Free", True, (255,255,0))
+        text = render_text("Flow Free", (255,255,0), font=self.logo_font)
         rect = text.get_rect(center=surface.get_rect().center)
         surface.blit(text, rect)
 
@@ -42,29 +100,138 @@ class MainMenuScreen(BaseScreen):
         self.switch_screen_callback = switch_screen_callback
         screen_rect = pygame.display.get_surface().get_rect()
         mid_x = screen_rect.centerx
-        self.buttons.append(Button(rect=(mid_x-100, 200, 200, 50),
+        self.buttons.append(Button(rect=(mid_x-100, 180, 200, 50),
                                    text="Play",
                                    callback=lambda: self.switch_screen_callback("game")))
-        self.buttons.append(Button(rect=(mid_x-100, 300, 200, 50),
+        self.buttons.append(Button(rect=(mid_x-100, 250, 200, 50),
+                                   text="Levels",
+                                   callback=lambda: self.switch_screen_callback("level_select")))
+        self.buttons.append(Button(rect=(mid_x-100, 320, 200, 50),
                                    text="Color Schemes",
                                    callback=lambda: self.switch_screen_callback("color_scheme")))
     
     def draw(self, surface):
         surface.fill((30, 30, 30))
-        font = pygame.font.SysFont(None, 48)
-        title = font.render("Main Menu", True, (255,255,255))
+        title = render_text("Main Menu", (255,255,255), size=48)
         title_rect = title.get_rect(center=(surface.get_width()//2, 100))
         surface.blit(title, title_rect)
         super().draw(surface)
 
+class LevelSelectScreen(BaseScreen):
+    """
+    Scrollable list of every level with a preview of each. Only the rows in
+    view are drawn, and their thumbnails come from a shared atlas filled by
+    a background thread (see thumbnails.py), so packs of any size scroll
+    at the same cost.
+    """
+    ROW_HEIGHT = 64
+    LIST_RECT = (0, 60, 400, 380)
+
+    def __init__(self, switch_screen_callback):
+        super().__init__()
+        self.switch_screen_callback = switch_screen_callback
+        self.list_rect = pygame.Rect(self.LIST_RECT)
+        self.scroll = 0  # pixels of the list above list_rect's top
+        self.count = 0
+        self.buttons.append(Button(rect=(10, 450, 100, 40),
+                                   text="Back",
+                                   callback=lambda: self.switch_screen_callback("main_menu")))
+        thumbnail_atlas.on_ready = wake_main_loop
+        self.enter()
+
+    def enter(self, extra=None):
+        super().enter(extra)
+        self.count = level_count()  # a pack may have been loaded since the last visit
+        self._scroll_by(0)
+
+    def visible_rows(self):
+        """range of the level indices with a row (partly) in view."""
+        first = self.scroll // self.ROW_HEIGHT
+        last = -(-(self.scroll + self.list_rect.height) // self.ROW_HEIGHT)
+        return range(first, min(last, self.count))
+
+    def _scroll_by(self, dy):
+        limit = max(0, self.count * self.ROW_HEIGHT - self.list_rect.height)
+        scroll = max(0, min(limit, self.scroll + dy))
+        if scroll != self.scroll:
+            self.scroll = scroll
+            self.dirty = True
+
+    def update(self, dt):
+        if thumbnail_atlas.update():
+            self.dirty = True
+
+    def draw(self, surface):
+        surface.fill((30, 30, 30))
+        title = render_text("Levels", (255, 255, 255), size=48)
+        surface.blit(title, title.get_rect(center=(surface.get_width() // 2, 30)))
+
+        rows = self.visible_rows()
+        levels = [get_level(i) for i in rows]
+        # Ask for what is on screen first, then a screenful either side
+        page = len(rows)
+        ahead = range(rows.stop, min(self.count, rows.stop + page))
+        behind = range(max(0, rows.start - page), rows.start)
+        thumbnail_atlas.request(levels + [get_level(i) for i in ahead] + [get_level(i) for i in behind])
+
+        old_clip = surface.get_clip()
+        surface.set_clip(self.list_rect)
+        for index, level in zip(rows, levels):
+            self._draw_row(surface, index, level)
+        surface.set_clip(old_clip)
+
+        if self.count * self.ROW_HEIGHT > self.list_rect.height:
+            # Scrollbar thumb, sized by the share of the list in view
+            total = self.count * self.ROW_HEIGHT
+            height = max(20, self.list_rect.height * self.list_rect.height // total)
+            y = self.list_rect.y + (self.list_rect.height - height) * self.scroll // (total - self.list_rect.height)
+            pygame.draw.rect(surface, (120, 120, 120), (self.list_rect.right - 6, y, 4, height))
+        super().draw(surface)
+
+    def _draw_row(self, surface, index, level):
+        top = self.list_rect.y + index * self.ROW_HEIGHT - self.scroll
+        row = pygame.Rect(self.list_rect.x, top, self.list_rect.width, self.ROW_HEIGHT)
+        pygame.draw.line(surface, (60, 60, 60), row.bottomleft, row.bottomright)
+        thumb = pygame.Rect(row.x + 8, row.y + (self.ROW_HEIGHT - thumbnail_atlas.size) // 2,
+                            thumbnail_atlas.size, thumbnail_atlas.size)
+        slot = thumbnail_atlas.get(level)
+        if slot is not None:
+            page, area = slot
+            surface.blit(page, thumb, area)
+        else:
+            pygame.draw.rect(surface, (60, 60, 60), thumb, width=1)  # still rendering
+            if thumbnail_atlas.failed(level):
+                pygame.draw.line(surface, (120, 60, 60), thumb.topleft, thumb.bottomright)
+                pygame.draw.line(surface, (120, 60, 60), thumb.bottomleft, thumb.topright)
+        height, width, grid = parse_level(level, flat=True, letters=True)
+        colors = len(set(grid) - {None})
+        label = render_text("Level %d" % (index + 1), (255, 255, 255), size=32)
+        surface.blit(label, (thumb.right + 12, row.y + 10))
+        info = render_text("%d x %d, %d colors" % (height, width, colors), (170, 170, 170), size=24)
+        surface.blit(info, (thumb.right + 12, row.y + 38))
+
+    def handle_event(self, event):
+        super().handle_event(event)
+        if event.type == pygame.MOUSEWHEEL:
+            self._scroll_by(-event.y * self.ROW_HEIGHT)
+        elif event.type == pygame.KEYDOWN:
+            steps = {pygame.K_UP: -self.ROW_HEIGHT, pygame.K_DOWN: self.ROW_HEIGHT,
+                     pygame.K_PAGEUP: -self.list_rect.height, pygame.K_PAGEDOWN: self.list_rect.height,
+                     pygame.K_HOME: -self.scroll, pygame.K_END: self.count * self.ROW_HEIGHT}
+            if event.key in steps:
+                self._scroll_by(steps[event.key])
+        elif (event.type == pygame.MOUSEBUTTONDOWN and event.button == 1
+              and self.list_rect.collidepoint(event.pos)):
+            index = (event.pos[1] - self.list_rect.y + self.scroll) // self.ROW_HEIGHT
+            if index < self.count:
+                self.switch_screen_callback("game", extra=index)
+
 class GameScreen(BaseScreen):
     def __init__(self, switch_screen_callback, level_data=None):
         super().__init__()
         self.switch_screen_callback = switch_screen_callback
-        # Load a level; if none is provided, use default from levels.py
-        if level_data is None:
-            level_data = get_level(0)
-        self.board = Board(level_data, cell_size=60)
+        self.board = None
+        self.full_redraw = True  # next draw repaints everything, not just board changes
         # Add control buttons
         self.buttons.append(Button(rect=(10, 400, 100, 40),
                                    text="Back",
@@ -75,55 +242,167 @@ class GameScreen(BaseScreen):
         self.buttons.append(Button(rect=(230, 400, 100, 40),
                                    text="Restart",
                                    callback=self.restart))
+        self.buttons.append(Button(rect=(10, 450, 100, 40),
+                                   text="Hint",
+                                   callback=self.hint))
+        self.buttons.append(Button(rect=(120, 450, 100, 40),
+                                   text="Redo",
+                                   callback=self.redo))
+        self.pending_hint = None  # (board, hint) delivered by a background search
+        self.enter(level_data)
+
+    def enter(self, extra=None):
+        """
+        extra is level data, a level index, or None to carry on with the
+        current level (the next one if it was solved; level 0 at first).
+        """
+        super().enter(extra)
+        if isinstance(extra, int):
+            self.load(get_level(extra), extra)
+        elif extra is not None:
+            self.load(extra)
+        elif self.board is None:
+            self.load(get_level(0), 0)
+        elif self.board.solved:
+            self.load(get_level(self.next_level()), self.next_level())
+        self.full_redraw = True
+
+    def load(self, level_data, level_index=None):
+        """Start level_data (level_index is None for generated puzzles)."""
+        self.level_data = level_data
+        self.level_index = level_index
+        self.board = preloader.take(level_data) or Board(level_data, cell_size=60, view_rect=BOARD_RECT)
+        self.pending_hint = None
+
+    def next_level(self):
+        if self.level_index is None:
+            return 0
+        return (self.level_index + 1) % level_count()
     
     def undo(self):
-        print("Undo pressed")
-        # Implement undo logic if desired
+        self.board.undo()
+
+    def redo(self):
+        self.board.redo()
     
     def restart(self):
         print("Restart pressed")
-        # Restart the level by reinitializing the board
-        # (For simplicity, we reload the same level)
-        from levels import get_level
-        self.board = Board(get_level(0), cell_size=60)
+        # Reset the current level in place; the parsed grid and cached layers are kept
+        self.board.reset()
+        self.full_redraw = True
     
+    def hint(self):
+        board = self.board
+        hint = hint_engine.hint(board, callback=lambda h: self._hint_ready(board, h))
+        if hint is not None:
+            board.set_path(hint.color, hint.cells)
+
+    def _hint_ready(self, board, hint):
+        # Runs on the hint worker thread; update() applies it on the main thread
+        if hint is not None:
+            self.pending_hint = (board, hint)
+            wake_main_loop()
+
+    def frame_rate(self):
+        # Smooth drags; otherwise the board only changes in response to events
+        return 60 if self.board.mouse_down else 0
+
     def update(self, dt):
+        if self.pending_hint is not None:
+            board, hint = self.pending_hint
+            self.pending_hint = None
+            if board is self.board:
+                self.board.set_path(hint.color, hint.cells)
         self.board.update(dt)
         # If the board is solved, switch to the level completion screen
         if self.board.solved:
-            self.switch_screen_callback("level_complete", extra=self.board)
+            self.switch_screen_callback("level_complete", extra=(self.board, self.next_level()))
     
     def draw(self, surface):
-        surface.fill((0, 0, 0))
-        self.board.draw(surface)
-        super().draw(surface)
+        if self.full_redraw:
+            self.full_redraw = False
+            surface.fill((0, 0, 0))
+            self.board.draw(surface)
+            super().draw(surface)
+            return None
+
+        # Only the board changes between frames; repaint any button it overlaps
+        rects = self.board.draw(surface, full=False)
+        if rects:
+            for btn in self.buttons:
+                if btn.rect.collidelist(rects) != -1:
+                    btn.draw(surface)
+                    rects.append(btn.rect)
+        return rects
     
     def handle_event(self, event):
+        if event.type == pygame.VIDEOEXPOSE:
+            self.full_redraw = True
         self.board.handle_event(event)
         super().handle_event(event)
+        # Board draws are incremental, so a redraw after any event is cheap
+        self.dirty = True
 
 class LevelCompletionScreen(BaseScreen):
-    def __init__(self, switch_screen_callback, board):
+    def __init__(self, switch_screen_callback, extra):
         super().__init__()
         self.switch_screen_callback = switch_screen_callback
-        self.board = board
         screen_rect = pygame.display.get_surface().get_rect()
         mid_x = screen_rect.centerx
-        self.message = "Level Completed!"
         self.buttons.append(Button(rect=(mid_x-100, 300, 200, 50),
                                    text="Next Level",
-                                   callback=lambda: self.switch_screen_callback("game")))
+                                   callback=lambda: self.switch_screen_callback("game", extra=self.next_index)))
         self.buttons.append(Button(rect=(mid_x-100, 370, 200, 50),
                                    text="New Puzzle",
-                                   callback=lambda: self.switch_screen_callback("game")))
+                                   callback=self.new_puzzle))
         self.buttons.append(Button(rect=(mid_x-100, 440, 200, 50),
                                    text="Home",
                                    callback=lambda: self.switch_screen_callback("main_menu")))
+        self.enter(extra)
+
+    def enter(self, extra=None):
+        """extra is (solved board, index of the next level)."""
+        super().enter(extra)
+        self.board, self.next_index = extra
+        self.message = "Level Completed!"
+        self.generating = None  # (thread, result list) while New Puzzle is being made
+        # Build the next Board while the player reads this screen, so Next Level is instant
+        preloader.request(get_level(self.next_index))
     
+    def new_puzzle(self):
+        # A fresh puzzle the same size as the one just solved, made on a worker
+        # thread like the preloader's Boards; update() switches once it's ready
+        if self.generating is not None:
+            return
+        height, width, colors = self.board.height, self.board.width, len(self.board.endpoints)
+        next_index = self.next_index
+        result = []
+
+        def work():
+            # The generator (argparse, multiprocessing) is only imported once it's wanted
+            from generator import generate, min_colors
+            try:
+                # Hand-made levels may have fewer colors than generate() accepts
+                result.append(generate(height, width, max(colors, min_colors(height, width))).level)
+            except (ValueError, RuntimeError):
+                # No puzzle of this shape: go on to the next level instead
+                result.append(next_index)
+            wake_main_loop()
+
+        self.generating = (threading.Thread(target=work, daemon=True), result)
+        self.generating[0].start()
+        self.message = "Generating..."
+        self.dirty = True
+
+    def update(self, dt):
+        if self.generating is not None and self.generating[1]:
+            level = self.generating[1][0]
+            self.generating = None
+            self.switch_screen_callback("game", extra=level)
+
     def draw(self, surface):
         surface.fill((20, 20, 20))
-        font = pygame.font.SysFont(None, 60)
-        text = font.render(self.message, True, (0, 255, 0))
+        text = render_text(self.message, (0, 255, 0), size=60)
         rect = text.get_rect(center=(surface.get_width()//2, 150))
         surface.blit(text, rect)
         super().draw(surface)
@@ -220,13 +499,12 @@ class ColorSchemeScreen(BaseScreen):
         scheme = self.schemes[scheme_name]
         # Apply the scheme instantly.
         self.apply_scheme_callback(scheme)
-        # Immediately switch back to the game screen (a new Board will be created using the new scheme).
+        # Switch back to the game; the board keeps its progress and picks up the new palette when drawn.
         self.switch_screen_callback("game")
     
     def draw(self, surface):
         surface.fill((40, 40, 40))
-        font = pygame.font.SysFont(None, 48)
-        text = font.render("Color Schemes", True, (255, 255, 255))
+        text = render_text("Color Schemes", (255, 255, 255), size=48)
         rect = text.get_rect(center=(surface.get_width() // 2, 80))
         surface.blit(text, rect)
         super().draw(surface)
@@ -0,0 +1,724 @@
+import time
+from level_notation import parse_level
+
+
+class _OutOfTime(Exception):
+    """Raised inside propagation when the deadline passes in a long run of forced moves."""
+
+
+def _finish(search):
+    """Run a search generator to the end; returns its (found, complete)."""
+    while True:
+        try:
+            next(search)
+        except StopIteration as stop:
+            return stop.value
+
+
+def _race(*searches, turn=0.005):
+    """Run search generators in turns of about turn seconds until one finishes; returns its result."""
+    while True:
+        for search in searches:
+            end = time.perf_counter() + turn
+            try:
+                while time.perf_counter() < end:
+                    next(search)
+            except StopIteration as stop:
+                return stop.value
+
+
+class SolveResult:
+    """Outcome of a solver run: paths in Board.paths form plus search stats."""
+    def __init__(self, paths, solutions, nodes, elapsed, complete, branches=0):
+        self.paths = paths            # color -> list of (row, col), or None if unsolvable
+        self.solutions = solutions    # number of distinct solutions found (capped by max_solutions)
+        self.nodes = nodes            # search nodes expanded (branch points + forced moves)
+        self.elapsed = elapsed        # seconds spent searching
+        self.complete = complete      # False if the search stopped before exhausting every branch
+        self.branches = branches      # nodes where the search had to guess between moves
+
+    @property
+    def solved(self):
+        return self.paths is not None
+
+    @property
+    def unique(self):
+        """True only if the search ran to the end and found exactly one solution."""
+        return self.complete and self.solutions == 1
+
+    def __repr__(self):
+        return "SolveResult(solved=%s, solutions=%d, nodes=%d, elapsed=%.4fs)" % (
+            self.solved, self.solutions, self.nodes, self.elapsed)
+
+
+class Solver:
+    """
+    Depth-first solver for a parsed grid.
+
+    The grid holds a color label (anything hashable) for endpoint cells and None
+    elsewhere, i.e. the third value returned by parse_level. A solution is
+    what the game accepts: every color joined by a path of adjacent cells
+    from one endpoint to the other, no cell used twice and every cell covered.
+    Paths may run alongside themselves.
+
+    Every color grows from both of its endpoints ("tips"); a color is finished
+    when one tip steps onto the other. The search prunes with:
+      - forced moves: a tip with a single legal move is extended without branching
+      - dead ends: an empty cell with fewer than two free neighbours, or with
+        exactly two that are tips of different colors
+      - forced cells: an empty cell whose only two free neighbours include a
+        tip must be entered by that tip
+      - stranded regions: every empty region must be reachable by both tips of
+        some unfinished color, and every unfinished color needs such a region
+        (or its tips side by side)
+      - parity: a path alternates between checkerboard shades, so each empty
+        region's count of one shade less the other must be what the colors
+        filling it can make up
+    After a move only the cells around it are rechecked, so forced moves cost
+    the same on any board size. The search branches on the tip with the
+    fewest legal moves, trying moves that keep its path clear of itself
+    first. Counting solutions explores every path the game accepts; finding
+    just one first searches only paths that never run alongside themselves,
+    a far smaller search that nearly always succeeds, and falls back to the
+    full one if it finds nothing.
+
+    That first search runs twice over, taking turns: the tip search above,
+    and a search that colors cells instead of extending tips (_color_search).
+    Each color's cells must join its endpoints, so the coloring search drops
+    colors from cells their endpoints can no longer reach and fixes the ones
+    every remaining route passes through, which settles large open boards
+    the tip search wanders in; the tip search is the faster one on tight
+    boards.
+    """
+    def __init__(self, height, width, grid):
+        self.height = height
+        self.width = width
+        self.size = height * width
+
+        ends = {}
+        for r in range(height):
+            for c in range(width):
+                label = grid[r][c]
+                if label is not None:
+                    ends.setdefault(label, []).append(r * width + c)
+        for label, cells in ends.items():
+            if len(cells) != 2:
+                raise ValueError("color %r has %d endpoints, expected 2" % (label, len(cells)))
+
+        self.colors = list(ends)
+        self.ends = [ends[label] for label in self.colors]
+
+        self.neighbors = []
+        for r in range(height):
+            for c in range(width):
+                nbrs = []
+                if r > 0:
+                    nbrs.append((r - 1) * width + c)
+                if r < height - 1:
+                    nbrs.append((r + 1) * width + c)
+                if c > 0:
+                    nbrs.append(r * width + c - 1)
+                if c < width - 1:
+                    nbrs.append(r * width + c + 1)
+                self.neighbors.append(tuple(nbrs))
+        # Checkerboard colouring: a path's cells alternate between +1 and -1
+        self.shade = [1 - 2 * ((i // width + i % width) & 1) for i in range(self.size)]
+
+        # For the coloring search: cell i as one bit of a row-major bitboard with
+        # a spare column, so shifting by 1 or stride never wraps onto another row
+        self.stride = width + 1
+        self.bit = [1 << (i // width * self.stride + i % width) for i in range(self.size)]
+        self.cell_at = {b: i for i, b in enumerate(self.bit)}
+        # For each cell, the other three cells of every 2x2 square holding it
+        self.squares = [[] for _ in range(self.size)]
+        for r in range(height - 1):
+            for c in range(width - 1):
+                square = (r * width + c, r * width + c + 1, (r + 1) * width + c, (r + 1) * width + c + 1)
+                for i in square:
+                    self.squares[i].append(tuple(j for j in square if j != i))
+
+        self.nodes = 0
+        self.branches = 0
+        self.elapsed = 0.0
+        self.node_limit = None
+        self.deadline = None
+        self._touching = True
+
+    def solve(self, max_solutions=1, node_limit=None, time_limit=None, fixed=None, deadline=None):
+        """
+        Search for up to max_solutions solutions; returns a SolveResult.
+
+        node_limit and time_limit (seconds) cap the search, as does deadline,
+        a time.perf_counter() value several searches can share. fixed maps
+        colors to paths (lists of (row, col)) that are taken as already drawn,
+        e.g. the player's finished paths; only the remaining colors are searched.
+        """
+        start_time = time.perf_counter()
+        self.deadline = deadline
+        if time_limit is not None and (deadline is None or start_time + time_limit < deadline):
+            self.deadline = start_time + time_limit
+        self.node_limit = node_limit
+        self.nodes = 0
+        self.branches = 0
+
+        fixed = fixed or {}
+        root = self._root(fixed)
+
+        if max_solutions == 1:
+            # Any one solution will do, and nearly always one exists whose paths
+            # stay clear of themselves: that search is far smaller, so try it
+            # first. Two searches cover that space and each is fast where the
+            # other can stall, so they take turns and the first to finish
+            # decides. Other solutions may remain, so it never counts as complete.
+            found, complete = _race(self._search(root, 1, touching=False), self._color_search(root))
+            if found:
+                complete = False
+            elif complete:
+                found, complete = _finish(self._search(root, 1, touching=True))
+        else:
+            found, complete = _finish(self._search(root, max_solutions, touching=True))
+
+        self.elapsed = time.perf_counter() - start_time
+        paths = self._paths(found[0], fixed) if found else None
+        return SolveResult(paths, len(found), self.nodes, self.elapsed, complete, self.branches)
+
+    def _root(self, fixed):
+        """The starting state (owner, tips, active) with the fixed paths drawn in."""
+        owner = bytearray(self.size)
+        tips = []
+        active = []
+        for k, (a, b) in enumerate(self.ends):
+            owner[a] = owner[b] = k + 1
+            tips += [a, b]
+            path = fixed.get(self.colors[k])
+            if path:
+                for r, c in path:
+                    cell = r * self.width + c
+                    if owner[cell] not in (0, k + 1):
+                        raise ValueError("fixed path for %r overlaps another color" % (self.colors[k],))
+                    owner[cell] = k + 1
+            else:
+                active.append(k)
+        return owner, tips, tuple(active)
+
+    def _search(self, root, max_solutions, touching):
+        """
+        Depth-first search from root (owner, tips, active), as a generator that
+        yields before each step and returns (trails of the solutions found, whether
+        every branch was explored). With touching False, paths may not run
+        alongside themselves.
+        """
+        self._touching = touching
+        found = []
+        owner, tips, active = root
+        # (owner, tips, unfinished colors, cells to recheck, trail of tip moves)
+        stack = [(bytearray(owner), list(tips), active, range(self.size), None)]
+        while stack:
+            yield
+            if self.node_limit is not None and self.nodes >= self.node_limit:
+                break
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                break
+            owner, tips, active, recheck, trail = stack.pop()
+            try:
+                state = self._propagate(owner, tips, active, recheck, trail)
+            except _OutOfTime:
+                return found, False
+            if state is None:
+                continue
+            active, trail = state
+            if not active:
+                found.append(trail)
+                if len(found) >= max_solutions:
+                    break
+                continue
+
+            idx, moves = self._pick(owner, tips, active)
+            self.nodes += 1
+            if len(moves) > 1:
+                self.branches += 1
+            # Push in reverse so the preferred move is explored first.
+            for n in reversed(moves):
+                child_owner = bytearray(owner)
+                child_tips = list(tips)
+                child_active, child_trail, touched = self._extend(
+                    child_owner, child_tips, active, trail, idx, n)
+                stack.append((child_owner, child_tips, child_active, touched, child_trail))
+
+        # Stopping at max_solutions or a limit leaves work on the stack, and
+        # then the solution count is only a lower bound.
+        return found, not stack
+
+    # Tips are numbered idx = 2 * color + side; idx ^ 1 is the other tip of the same color.
+
+    def _moves(self, owner, tips, idx):
+        """
+        Cells tip idx may step into: empty neighbours, or the other tip to
+        finish. Without touching, a tip next to the other one must finish,
+        and may not step alongside its own path.
+        """
+        tip = tips[idx]
+        other = tips[idx ^ 1]
+        neighbors = self.neighbors
+        if self._touching:
+            return [n for n in neighbors[tip] if not owner[n] or n == other]
+        if other in neighbors[tip]:
+            return [other]
+        color = (idx >> 1) + 1
+        moves = []
+        for n in neighbors[tip]:
+            if owner[n]:
+                continue
+            for m in neighbors[n]:
+                if m != tip and m != other and owner[m] == color:
+                    break
+            else:
+                moves.append(n)
+        return moves
+
+    def _pick(self, owner, tips, active):
+        """
+        Choose the most constrained tip: fewest moves, then the most enclosed
+        (fewest empty cells around its moves). Returns (tip, ordered moves).
+        """
+        neighbors = self.neighbors
+        best = None
+        for k in active:
+            for idx in (2 * k, 2 * k + 1):
+                moves = self._moves(owner, tips, idx)
+                if len(moves) <= 1:
+                    return idx, moves
+                key = (len(moves), sum(1 for n in moves for m in neighbors[n] if not owner[m]))
+                if best is None or key < best[0]:
+                    best = (key, idx, moves)
+        _, idx, moves = best
+        tip = tips[idx]
+        other = tips[idx ^ 1]
+        color = (idx >> 1) + 1
+
+        def order(n):
+            # Finishing first, then cells that keep the path clear of itself,
+            # then those hugging walls and other paths
+            touches = any(owner[m] == color for m in neighbors[n] if m != tip and m != other)
+            return (n != other, touches, sum(1 for m in neighbors[n] if not owner[m]))
+
+        moves.sort(key=order)
+        return idx, moves
+
+    def _extend(self, owner, tips, active, trail, idx, n):
+        """
+        Move tip idx into cell n in place. Returns the new active tuple and
+        trail, and the cells whose constraints the move changed.
+        """
+        old = tips[idx]
+        other = tips[idx ^ 1]
+        neighbors = self.neighbors
+        if n == other:
+            # The tips meet: the color is finished and neither is a tip any more
+            k = idx >> 1
+            return tuple(a for a in active if a != k), trail, neighbors[old] + neighbors[other]
+        owner[n] = (idx >> 1) + 1
+        tips[idx] = n
+        # The other tip too: which cells run alongside the path has changed
+        return active, (idx, n, trail), neighbors[old] + neighbors[n] + (n, other)
+
+    def _propagate(self, owner, tips, active, recheck, trail):
+        """
+        Apply forced moves until none remain, then check regions. Returns the
+        new (active, trail), or None if the state is dead.
+
+        Only cells in `recheck`, and those around each forced move, are
+        looked at: a cell's constraints change only when a neighbour does.
+        """
+        neighbors = self.neighbors
+        deadline = self.deadline
+        tip_at = {}
+        for k in active:
+            tip_at[tips[2 * k]] = 2 * k
+            tip_at[tips[2 * k + 1]] = 2 * k + 1
+        todo = list(recheck)
+        while todo:
+            e = todo.pop()
+            if not owner[e]:
+                # An empty cell is passed through, so it needs two free neighbours;
+                # if it has only two and one is a tip, that tip has to enter it
+                free = [m for m in neighbors[e] if not owner[m] or m in tip_at]
+                if len(free) != 2:
+                    if len(free) < 2:
+                        return None
+                    continue
+                a, b = tip_at.get(free[0]), tip_at.get(free[1])
+                if a is None:
+                    if b is None:
+                        continue
+                    a = b
+                elif b is not None and a >> 1 != b >> 1:
+                    return None
+                if not self._touching and e not in self._moves(owner, tips, a):
+                    return None
+                idx, n = a, e
+            elif e in tip_at:
+                idx = tip_at[e]
+                moves = self._moves(owner, tips, idx)
+                if len(moves) != 1:
+                    if not moves:
+                        return None
+                    continue
+                n = moves[0]
+            else:
+                continue
+
+            self.nodes += 1
+            if deadline is not None and not self.nodes & 1023 and time.perf_counter() > deadline:
+                raise _OutOfTime
+            del tip_at[tips[idx]]
+            if n == tips[idx ^ 1]:
+                del tip_at[n]
+            else:
+                tip_at[n] = idx
+            active, trail, touched = self._extend(owner, tips, active, trail, idx, n)
+            todo.extend(touched)
+
+        if not self._regions_ok(owner, tips, active):
+            return None
+        return active, trail
+
+    def _regions_ok(self, owner, tips, active):
+        """Reject states with an empty region no unfinished color can fill."""
+        size = self.size
+        neighbors = self.neighbors
+        shade = self.shade
+        region = [-1] * size
+        balance = []  # per region: sum of shade over its cells
+        count = 0
+        for start in range(size):
+            if owner[start] or region[start] != -1:
+                continue
+            region[start] = count
+            todo = [start]
+            total = 0
+            while todo:
+                cell = todo.pop()
+                total += shade[cell]
+                for m in neighbors[cell]:
+                    if not owner[m] and region[m] == -1:
+                        region[m] = count
+                        todo.append(m)
+            balance.append(total)
+            count += 1
+
+        if not active:
+            return count == 0
+
+        # A path from tip a to tip b alternates shades, so the empty cells it
+        # fills sum to -shade[a] if both tips share a shade and to 0 otherwise.
+        # Each region's cells are filled by colors with both tips on it, so
+        # its balance must lie within what those colors can add up to.
+        served = [False] * count
+        low = [0] * count
+        high = [0] * count
+        for k in active:
+            a, b = tips[2 * k], tips[2 * k + 1]
+            a_regions = {region[m] for m in neighbors[a] if not owner[m]}
+            shared = b in neighbors[a]
+            common = []
+            for m in neighbors[b]:
+                if not owner[m] and region[m] in a_regions and region[m] not in common:
+                    common.append(region[m])
+            if common:
+                shared = True
+            elif not shared:
+                return False
+            sum_ = -shade[a] if shade[a] == shade[b] else 0
+            for r in common:
+                served[r] = True
+                if sum_ > 0:
+                    high[r] += 1
+                elif sum_ < 0:
+                    low[r] -= 1
+            if sum_ and len(common) == 1:
+                # Nowhere else to go: this color's share is certain
+                low[common[0]] += sum_ if sum_ > 0 else 0
+                high[common[0]] += sum_ if sum_ < 0 else 0
+        for r in range(count):
+            if not (served[r] and low[r] <= balance[r] <= high[r]):
+                return False
+        return True
+
+    def _color_search(self, root):
+        """
+        The search for paths clear of themselves again, as a coloring of the
+        empty cells: a generator like _search, returning the same trails.
+
+        Every empty cell keeps the colors it may still take as a bitmask, and
+        masks[k] is the bitboard of cells that may still take color k. A path
+        that never runs alongside itself is exactly a set of cells where each
+        endpoint has one neighbour of its color, every other cell two, and
+        the cells are joined to the endpoints. _narrow enforces the counts
+        cell by cell, _routes the joining color by color; the search colors
+        the cell with the fewest colors left, most boxed in by decided cells.
+        """
+        owner, tips, active = root
+        size = self.size
+        neighbors = self.neighbors
+        if not active:
+            return ([None] if all(owner) else []), True
+
+        # Endpoints need one neighbour of their color, empty cells two;
+        # finished paths are walls with no colors at all
+        need = [2] * size
+        full = 0
+        for k in active:
+            full |= 1 << k
+            need[tips[2 * k]] = need[tips[2 * k + 1]] = 1
+        dom = []
+        for i in range(size):
+            if need[i] == 1:
+                dom.append(1 << owner[i] - 1)
+            else:
+                dom.append(0 if owner[i] else full)
+        masks = [0] * len(self.ends)
+        for k in active:
+            color = 1 << k
+            masks[k] = sum(self.bit[i] for i in range(size) if dom[i] & color)
+        routes = {}  # (k, masks[k]) -> what _route_cells found
+        if not self._propagate_colors(dom, masks, need, active, range(size), routes):
+            return [], True
+
+        stack = [(dom, masks)]
+        while stack:
+            if self.node_limit is not None and self.nodes >= self.node_limit:
+                return [], False
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                return [], False
+            yield
+            dom, masks = stack.pop()
+            best = None
+            for i in range(size):
+                d = dom[i]
+                if d & (d - 1):
+                    key = (bin(d).count("1"), sum(1 for n in neighbors[i] if dom[n] & (dom[n] - 1)))
+                    if best is None or key < best[0]:
+                        best = (key, i)
+            if best is None:
+                return [self._color_trail(dom, active)], False
+            i = best[1]
+            self.nodes += 1
+            self.branches += 1
+            if len(routes) > 100000:
+                routes.clear()
+            # Push in reverse so the lowest color is explored first
+            d = dom[i]
+            colors = []
+            while d:
+                colors.append(d & -d)
+                d &= d - 1
+            for color in reversed(colors):
+                child_dom = list(dom)
+                child_masks = list(masks)
+                self._set_colors(child_dom, child_masks, i, color)
+                if self._propagate_colors(child_dom, child_masks, need, active, (i,) + neighbors[i], routes):
+                    stack.append((child_dom, child_masks))
+        return [], True
+
+    def _set_colors(self, dom, masks, i, colors):
+        """Narrow cell i to colors (a subset of its own), keeping masks in step."""
+        gone = dom[i] ^ colors
+        dom[i] = colors
+        cell = self.bit[i]
+        while gone:
+            masks[(gone & -gone).bit_length() - 1] ^= cell
+            gone &= gone - 1
+
+    def _propagate_colors(self, dom, masks, need, active, recheck, routes):
+        """Narrow dom in place until nothing changes; False if a cell runs out of colors."""
+        neighbors = self.neighbors
+        while True:
+            if not self._narrow(dom, masks, need, recheck):
+                return False
+            changed = self._routes(dom, masks, active, routes)
+            if changed is None:
+                return False
+            if not changed:
+                return True
+            recheck = set(changed)
+            for i in changed:
+                recheck.update(neighbors[i])
+
+    def _narrow(self, dom, masks, need, recheck):
+        """
+        Apply the neighbour counts from the cells in recheck outwards; False
+        on a contradiction. A cell keeps a color only if enough neighbours
+        can take it and not too many already have it, and no 2x2 square may
+        be one color. A decided cell whose color has exactly as many possible
+        neighbours as it needs fixes them all; one that has all it needs
+        removes its color from the rest.
+        """
+        neighbors = self.neighbors
+        squares = self.squares
+        todo = set(recheck)
+        while todo:
+            i = todo.pop()
+            d = dom[i]
+            if not d:
+                continue
+            # Bitwise tallies over the neighbours: colors at least one, two or
+            # three of them can take, and colors one, two or three are fixed to
+            once = twice = thrice = fixed1 = fixed2 = fixed3 = 0
+            for n in neighbors[i]:
+                dn = dom[n]
+                thrice |= twice & dn
+                twice |= once & dn
+                once |= dn
+                if dn and not dn & (dn - 1):
+                    fixed3 |= fixed2 & dn
+                    fixed2 |= fixed1 & dn
+                    fixed1 |= dn
+            if need[i] == 2:
+                keep = d & twice & ~fixed3
+            else:
+                keep = d & once & ~fixed2
+            if keep & (keep - 1):
+                for a, b, c in squares[i]:
+                    if dom[a] and dom[a] == dom[b] == dom[c] and not dom[a] & (dom[a] - 1):
+                        keep &= ~dom[a]
+            if not keep:
+                return False
+            if keep != d:
+                self._set_colors(dom, masks, i, keep)
+                todo.update(neighbors[i])
+                d = keep
+                if not d & (d - 1):
+                    for square in squares[i]:
+                        todo.update(square)
+            if d & (d - 1):
+                continue
+            if need[i] == 2:
+                exact, done = not thrice & d, fixed2 & d
+            else:
+                exact, done = not twice & d, fixed1 & d
+            if exact == bool(done):
+                continue
+            for n in neighbors[i]:
+                dn = dom[n]
+                if dn & d and dn != d:
+                    self._set_colors(dom, masks, n, d if exact else dn & ~d)
+                    todo.add(n)
+                    todo.update(neighbors[n])
+                    if not dom[n] & (dom[n] - 1):
+                        for square in squares[n]:
+                            todo.update(square)
+        return True
+
+    def _routes(self, dom, masks, active, routes):
+        """
+        Per unfinished color, drop it from cells its endpoints can't reach
+        and fix it in cells every route between them passes. Returns the
+        changed cells, or None on a contradiction.
+        """
+        cell_at = self.cell_at
+        changed = []
+        for k in active:
+            key = (k, masks[k])
+            found = routes.get(key)
+            if found is None:
+                found = routes[key] = self._route_cells(k, masks[k])
+            if not found:
+                return None
+            lost, cuts = found
+            color = 1 << k
+            while lost:
+                i = cell_at[lost & -lost]
+                lost &= lost - 1
+                if dom[i] == color:
+                    return None
+                self._set_colors(dom, masks, i, dom[i] & ~color)
+                changed.append(i)
+            for i in cuts:
+                if dom[i] != color:
+                    if not dom[i] & color:
+                        return None
+                    self._set_colors(dom, masks, i, color)
+                    changed.append(i)
+        return changed
+
+    def _route_cells(self, k, allowed):
+        """
+        (bitboard of allowed cells out of reach of color k's endpoints, cells
+        on every route between them) within the bitboard allowed, or False
+        if no route is left.
+        """
+        a, b = self.ends[k]
+        start, end = self.bit[a], self.bit[b]
+        reach = self._flood(start, allowed)
+        if not reach & end:
+            return False
+        # A cell on every route is on the shortest one: walk that back from b
+        # through breadth-first layers, and see which of its cells cut a from b
+        stride = self.stride
+        layers = [start]
+        seen = start
+        while not seen & end:
+            front = layers[-1]
+            front = ((front << 1) | (front >> 1) | (front << stride) | (front >> stride)) & reach & ~seen
+            layers.append(front)
+            seen |= front
+        cuts = []
+        cell = end
+        for layer in reversed(layers[1:-1]):
+            cell = ((cell << 1) | (cell >> 1) | (cell << stride) | (cell >> stride)) & layer
+            cell &= -cell
+            if not self._flood(start, reach & ~cell) & end:
+                cuts.append(self.cell_at[cell])
+        return allowed & ~reach, cuts
+
+    def _flood(self, start, allowed):
+        """Cells of bitboard allowed connected to bitboard start."""
+        stride = self.stride
+        reach = start
+        while True:
+            grown = (reach | (reach << 1) | (reach >> 1) | (reach << stride) | (reach >> stride)) & allowed
+            if grown == reach:
+                return reach
+            reach = grown
+
+    def _color_trail(self, dom, active):
+        """A trail of tip moves, as _search builds, for the paths in a full coloring."""
+        neighbors = self.neighbors
+        trail = None
+        for k in active:
+            a, b = self.ends[k]
+            color = 1 << k
+            prev, cell = None, a
+            while True:
+                cell, prev = next(n for n in neighbors[cell] if n != prev and dom[n] == color), cell
+                if cell == b:
+                    break
+                trail = (2 * k, cell, trail)
+        return trail
+
+    def _paths(self, trail, fixed):
+        """Rebuild Board.paths from the trail of tip moves, endpoint [0] to [1]."""
+        grown = [[] for _ in range(2 * len(self.ends))]
+        while trail is not None:
+            idx, cell, trail = trail
+            grown[idx].append(cell)
+        width = self.width
+        paths = {}
+        for k, (a, b) in enumerate(self.ends):
+            if fixed.get(self.colors[k]):
+                paths[self.colors[k]] = list(fixed[self.colors[k]])
+                continue
+            # Side 0 grew from a (latest move first in the trail), side 1 from b
+            path = [a] + grown[2 * k][::-1] + grown[2 * k + 1] + [b]
+            paths[self.colors[k]] = [divmod(i, width) for i in path]
+        return paths
+
+
+def solve(level_data, max_solutions=1, node_limit=None, time_limit=None):
+    """
+    Solve a level given as [height, width, "encoded_string"]. Paths are keyed
+    by color letter, like Board.paths.
+    """
+    height, width, grid = parse_level(level_data, letters=True)
+    return Solver(height, width, grid).solve(max_solutions, node_limit, time_limit)
@@ -0,0 +1,45 @@
+"""Exhaustive solution counting for small boards, to check the solver against."""
+
+
+def _neighbors(height, width, r, c):
+    for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+        if 0 <= nr < height and 0 <= nc < width:
+            yield nr, nc
+
+
+def count_solutions(height, width, grid, limit=None):
+    """
+    Number of solutions the game accepts: every color joined by a simple path
+    between its endpoints, no shared cells, every cell covered. Tries every
+    path of every color, so only for tiny boards.
+    """
+    ends = {}
+    for r in range(height):
+        for c in range(width):
+            if grid[r][c] is not None:
+                ends.setdefault(grid[r][c], []).append((r, c))
+    colors = sorted(ends)
+    used = {cell for cells in ends.values() for cell in cells}
+    total = [0]
+
+    def route(i):
+        if limit is not None and total[0] >= limit:
+            return
+        if i == len(colors):
+            total[0] += len(used) == height * width
+            return
+        start, goal = ends[colors[i]]
+
+        def walk(cell):
+            for n in _neighbors(height, width, *cell):
+                if n == goal:
+                    route(i + 1)
+                elif n not in used:
+                    used.add(n)
+                    walk(n)
+                    used.discard(n)
+
+        walk(start)
+
+    route(0)
+    return total[0]
@@ -0,0 +1,43 @@
+import pytest
+
+from board_state import BoardState, CompactBoardState
+
+
+@pytest.mark.parametrize("board_class", [BoardState, CompactBoardState])
+def test_press_during_open_drag_finishes_it(board_class):
+    board = board_class([2, 3, "a1abb1"])
+    board.press((0, 0))
+    board.drag_to((0, 1))
+    # No release: the half-drawn path must not be left owning (0, 1)
+    assert board.press((1, 0))
+    board.drag_to((1, 1))
+    board.release()
+    assert board.cell_owner[0][1] is None
+    assert board.paths == {"a": None, "b": [(1, 0), (1, 1)]}
+    assert board.filled_cells == 2
+
+    assert board.undo()
+    assert board.filled_cells == 0
+    assert not board.undo()
+
+
+@pytest.mark.parametrize("board_class", [BoardState, CompactBoardState])
+def test_press_during_open_drag_keeps_a_finished_path(board_class):
+    board = board_class([2, 3, "a1abb1"])
+    board.press((0, 0))
+    board.drag_to((0, 1))
+    board.drag_to((0, 2))
+    board.press((1, 0))
+    board.drag_to((1, 1))
+    board.release()
+    assert board.paths == {"a": [(0, 0), (0, 1), (0, 2)], "b": [(1, 0), (1, 1)]}
+    assert board.flows_connected == 2
+    assert len(board.undo_stack) == 2
+
+
+def test_solving_prints_nothing(capsys):
+    board = BoardState([2, 3, "a1ab1b"])
+    board.set_path("a", [(0, 0), (0, 1), (0, 2)])
+    board.set_path("b", [(1, 0), (1, 1), (1, 2)])
+    assert board.solved
+    assert capsys.readouterr().out == ""
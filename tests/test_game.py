@@ -0,0 +1,112 @@
+import pygame
+import pytest
+
+from board_state import CompactBoardState
+from game import Board, CompactBoard
+from level_notation import encode_level
+
+LEVEL = [2, 3, "a1ab1b"]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def display():
+    pygame.display.init()
+    yield
+    pygame.display.quit()
+
+
+def test_headless_state_keeps_no_render_index():
+    board = CompactBoardState(LEVEL)
+    board.set_path("a", [(0, 0), (0, 1), (0, 2)])
+    assert not hasattr(board, "_path_pos")
+
+
+@pytest.mark.parametrize("board_class", [Board, CompactBoard])
+def test_render_index_follows_stored_paths(board_class, capsys):
+    board = board_class(LEVEL, cell_size=20)
+    board.set_path("a", [(0, 0), (0, 1), (0, 2)])
+    assert board._path_pos == {(0, 0): ("a", 0), (0, 1): ("a", 1), (0, 2): ("a", 2)}
+    board.set_path("b", [(1, 0), (1, 1), (1, 2)])
+    assert "Puzzle solved!" in capsys.readouterr().out
+    board.undo()
+    assert set(board._path_pos) == {(0, 0), (0, 1), (0, 2)}
+    board.reset()
+    assert board._path_pos == {}
+
+
+def _pixels(surface):
+    return pygame.image.tobytes(surface, "P")
+
+
+def test_panning_scrolls_the_layers_to_what_a_full_redraw_gives():
+    # Twelve U-shaped paths, each filling two rows of a 24 x 30 board
+    rows, cols = 24, 30
+    grid = [[None] * cols for _ in range(rows)]
+    paths = {}
+    for k, letter in enumerate("abcdefghijkl"):
+        grid[2 * k][0] = grid[2 * k + 1][0] = letter
+        paths[letter] = [(2 * k, c) for c in range(cols)] + [(2 * k + 1, c) for c in reversed(range(cols))]
+    board = Board(encode_level(grid), cell_size=20, view_rect=(10, 10, 230, 170))
+    for letter in "abcdefgh":
+        board.set_path(letter, paths[letter])
+    board.prerender()
+
+    for zoom in (1, 2.5):
+        if zoom != 1:
+            board._view_moved(board.view.zoom(zoom))
+        for dx, dy in [(-7, 0), (0, -13), (-25, -31), (40, 3), (-3, 17), (-200, 0), (0, -150)]:
+            assert board.view.pan(dx, dy)
+            board._view_moved(True)
+            board.prerender()
+            assert _pixels(board._static_layer) == _pixels(board._render_static())
+            assert _pixels(board._path_layer) == _pixels(board._render_paths())
+
+
+def _drag(board, start, *moves):
+    """Press at start (None: keep dragging) and queue a motion event to each of moves."""
+    if start is not None:
+        board.handle_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=start))
+    for pos in moves:
+        board.handle_event(pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(1, 0, 0)))
+
+
+def _side_by_side(path):
+    return all(abs(r0 - r1) + abs(c0 - c1) == 1 for (r0, c0), (r1, c1) in zip(path, path[1:]))
+
+
+def _corner_level(size):
+    grid = [[None] * size for _ in range(size)]
+    grid[0][0] = grid[size - 1][size - 1] = "a"
+    return encode_level(grid)
+
+
+def test_fast_drag_adds_every_crossed_cell():
+    board = Board(_corner_level(10), cell_size=20)
+    # One motion event jumps diagonally from cell (0, 0) to cell (5, 7)
+    _drag(board, (10, 10), (150, 110))
+    assert board.current_path == [(0, 0)]  # queued until the frame's flush
+    board.flush_motion()
+    path = list(board.current_path)
+    assert path[0] == (0, 0) and path[-1] == (5, 7)
+    assert len(path) == 1 + 5 + 7 and _side_by_side(path)
+    for r, c in path:
+        # Each cell is one the segment passes through: its centre lies
+        # within half a cell diagonal of the line
+        x, y = c * 20 + 10, r * 20 + 10
+        assert abs(100 * (x - 10) - 140 * (y - 10)) / (100 ** 2 + 140 ** 2) ** 0.5 <= 20 * 0.7072
+
+    # Long moves queued within one frame are applied together, in order
+    _drag(board, None, (150, 170), (30, 170))
+    board.flush_motion()
+    assert board.current_path == path + [(6, 7), (7, 7), (8, 7)] + [(8, c) for c in range(6, 0, -1)]
+
+
+def test_fast_drag_skips_cells_off_the_board_or_out_of_view():
+    # 20 x 20 cells of 8 pixels in a 100 pixel view: columns 0 to 12 show
+    board = Board(_corner_level(20), cell_size=8, view_rect=(0, 0, 100, 100))
+    _drag(board, (4, 4), (-40, 4))
+    board.flush_motion()
+    assert board.current_path == [(0, 0)]
+    _drag(board, None, (20, 4), (190, 4))
+    board.flush_motion()
+    assert board.current_path == [(0, c) for c in range(13)]
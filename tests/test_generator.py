@@ -0,0 +1,61 @@
+import json
+import time
+
+import pytest
+
+import generator
+import level_pack
+import validate_levels
+from brute_force import count_solutions
+from level_notation import parse_level
+from levels import read_levels
+
+
+@pytest.mark.parametrize("height,width,colors", [(4, 4, 3), (5, 5, 3), (5, 5, 4), (4, 6, 4)])
+def test_generated_levels_have_exactly_one_solution(height, width, colors):
+    for seed in range(15):
+        puzzle = generator.generate(height, width, colors, seed=seed)
+        h, w, grid = parse_level(puzzle.level, letters=True)
+        assert count_solutions(h, w, grid, limit=2) == 1, puzzle.level
+
+
+@pytest.mark.parametrize("height,width", [(7, 7), (8, 8), (9, 9), (7, 9)])
+def test_fewest_colors_generate_quickly(height, width):
+    colors = generator.min_colors(height, width)
+    start = time.perf_counter()
+    for seed in range(5):
+        puzzle = generator.generate(height, width, colors, seed=seed)
+        h, w, grid = parse_level(puzzle.level, letters=True)
+        assert len({label for row in grid for label in row if label}) == colors
+    assert time.perf_counter() - start < 5 * 0.3
+
+
+def test_too_few_colors_are_refused_up_front():
+    assert generator.min_colors(9, 9) == 7
+    start = time.perf_counter()
+    with pytest.raises(ValueError, match="needs at least 7 colors"):
+        generator.generate(9, 9, 5)
+    assert time.perf_counter() - start < 0.01
+
+
+def test_same_seed_same_puzzle():
+    assert generator.generate(5, 5, 4, seed=3).level == generator.generate(5, 5, 4, seed=3).level
+
+
+def test_cli_output_round_trips_through_pack_and_validator(tmp_path, capsys):
+    assert generator.main(["5", "5", "4", "--count", "6", "--workers", "1"]) == 0
+    generated = tmp_path / "generated.jsonl"
+    generated.write_text(capsys.readouterr().out)
+    levels = [json.loads(line)["level"] for line in generated.read_text().splitlines()]
+    assert list(read_levels(str(generated))) == levels
+
+    pack = tmp_path / "generated.pack"
+    assert level_pack.main([str(generated), str(pack)]) == 0
+    assert list(read_levels(str(pack))) == levels
+
+    for source in (generated, pack):
+        report = tmp_path / "report.jsonl"
+        assert validate_levels.main([str(source), "--workers", "1", "--output", str(report)]) == 0
+        reports = [json.loads(line) for line in report.read_text().splitlines()]
+        assert [r["index"] for r in reports] == list(range(len(levels)))
+        assert all(r["ok"] for r in reports)
@@ -0,0 +1,52 @@
+import threading
+import time
+
+from board_state import BoardState
+from hints import HintEngine
+
+# A layout the solver needs seconds for
+HARD = [15, 15, "2a3c6oi1d2e1g18n7e8m12n8h1l4ml12i14j1k25op7d8p4g7j7bf7k5f1c4h5a13b"]
+
+
+def test_hint_follows_the_solution():
+    board = BoardState([2, 3, "a1ab1b"])
+    hint = HintEngine().hint(board)
+    assert hint.kind == "path" and hint.color in ("a", "b")
+    board.set_path(hint.color, hint.cells)
+    other = HintEngine().hint(board)
+    assert other.color != hint.color
+
+
+def test_solution_cache_is_bounded():
+    engine = HintEngine(max_levels=2)
+    for level in ([2, 3, "a1ab1b"], [1, 3, "a1a"], [2, 2, "aabb"]):
+        engine.solution(BoardState(level))
+    assert len(engine._solutions) == 2
+
+
+def test_hint_returns_within_its_budget():
+    engine = HintEngine(budget=0.05, background_limit=0.1)
+    start = time.perf_counter()
+    assert engine.hint(BoardState(HARD), callback=lambda hint: None) is None
+    assert time.perf_counter() - start < 0.3
+
+
+def test_repeated_requests_share_one_search():
+    engine = HintEngine(budget=0.02, background_limit=1.0)
+    board = BoardState(HARD)
+    answered = []
+    done = threading.Event()
+
+    def callback(i):
+        def deliver(hint):
+            answered.append(i)
+            done.set()
+        return deliver
+
+    threads = threading.active_count()
+    for i in range(5):
+        engine.hint(board, callback=callback(i))
+    assert threading.active_count() == threads + 1
+    assert done.wait(5)
+    time.sleep(0.1)
+    assert answered == [4]
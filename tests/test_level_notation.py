@@ -0,0 +1,59 @@
+import pytest
+
+import colors
+from colors import DEFAULT_COLORS
+from level_notation import encode_level, parse_level, parse_level_array
+
+LEVEL = [2, 3, "a1ab1b"]
+
+
+@pytest.fixture
+def restore_scheme():
+    yield
+    colors.set_scheme({})
+
+
+def test_parse_rows_and_flat():
+    a, b = DEFAULT_COLORS["a"], DEFAULT_COLORS["b"]
+    assert parse_level(LEVEL) == (2, 3, [[a, None, a], [b, None, b]])
+    assert parse_level(LEVEL, flat=True, letters=True) == (2, 3, ["a", None, "a", "b", None, "b"])
+    assert encode_level(parse_level(LEVEL, letters=True)[2]) == LEVEL
+
+
+def test_returned_grids_are_copies():
+    parse_level(LEVEL)[2][0][0] = "x"
+    assert parse_level(LEVEL)[2][0][0] == DEFAULT_COLORS["a"]
+
+
+def test_padding_and_strict_errors():
+    assert parse_level([2, 2, "a"], letters=True)[2] == [["a", None], [None, None]]
+    assert parse_level([1, 2, "a99999999999b"], letters=True)[2] == [["a", None]]
+    with pytest.raises(ValueError, match="expected 2 x 2"):
+        parse_level([2, 2, "a"], strict=True)
+    with pytest.raises(ValueError, match="more than 2"):
+        parse_level([1, 2, "a99999999999b"], strict=True)
+    with pytest.raises(ValueError, match="unknown color letter 'z'"):
+        parse_level([1, 2, "az"], strict=True)
+
+
+def test_cache_follows_the_color_scheme(restore_scheme):
+    before = parse_level(LEVEL)[2][0][0]
+    colors.set_scheme({"a": (1, 2, 3)})
+    assert parse_level(LEVEL)[2][0][0] == (1, 2, 3)
+    colors.set_scheme({})
+    assert parse_level(LEVEL)[2][0][0] == before
+
+
+def test_array_ids_are_by_letter(restore_scheme):
+    np = pytest.importorskip("numpy")
+    colors.set_scheme({"b": DEFAULT_COLORS["a"]})  # a and b now look alike
+    height, width, array = parse_level_array(LEVEL)
+    assert array.tolist() == [[1, 0, 1], [2, 0, 2]]
+    assert array.dtype == np.int8
+
+
+def test_encoding_refuses_colors_letters_share(restore_scheme):
+    colors.set_scheme({"b": DEFAULT_COLORS["a"]})  # a and b now look alike
+    with pytest.raises(ValueError, match="more than one letter"):
+        encode_level(parse_level(LEVEL)[2])
+    assert encode_level(parse_level(LEVEL, letters=True)[2]) == LEVEL
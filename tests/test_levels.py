@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+import levels
+from level_pack import write_pack
+
+PACKED = [[2, 3, "a1ab1b"], [1, 3, "a1a"]]
+
+
+@pytest.fixture
+def fresh_levels(monkeypatch):
+    monkeypatch.setattr(levels, "_pack", None)
+    monkeypatch.setattr(levels, "_levels", None)
+    yield
+    if levels._pack is not None:
+        levels._pack.close()
+
+
+def test_default_pack_is_looked_for_once(fresh_levels, monkeypatch, tmp_path):
+    looked = []
+    exists = os.path.exists
+    monkeypatch.setattr(levels, "DEFAULT_PACK", str(tmp_path / "missing.pack"))
+    monkeypatch.setattr(levels.os.path, "exists", lambda path: looked.append(path) or exists(path))
+    for i in range(5):
+        assert levels.get_level(i) == levels.LEVELS[i % len(levels.LEVELS)]
+    assert levels.level_count() == len(levels.LEVELS)
+    assert len(looked) == 1
+
+
+def test_load_pack_switches_levels(fresh_levels, tmp_path):
+    assert levels.get_level(0) == levels.LEVELS[0]
+    path = str(tmp_path / "extra.pack")
+    write_pack(path, PACKED)
+    levels.load_pack(path)
+    assert levels.level_count() == 2
+    assert [levels.get_level(i) for i in range(3)] == PACKED + PACKED[:1]
+
+
+def test_read_levels_takes_generator_objects(tmp_path):
+    path = tmp_path / "levels.jsonl"
+    path.write_text('[2, 3, "a1ab1b"]\n\n{"level": [1, 3, "a1a"], "rating": "easy"}\n')
+    assert list(levels.read_levels(str(path))) == PACKED
@@ -0,0 +1,105 @@
+import random
+import time
+
+import pytest
+
+from board_state import BoardState
+from brute_force import count_solutions
+from generator import random_layout
+from level_notation import encode_level, parse_level
+from solver import Solver, _finish, solve
+
+
+def random_level(height, width, colors, rng):
+    grid = [[None] * width for _ in range(height)]
+    cells = rng.sample([(r, c) for r in range(height) for c in range(width)], 2 * colors)
+    for i, (r, c) in enumerate(cells):
+        grid[r][c] = "abcdefgh"[i // 2]
+    return grid
+
+
+def layout_level(height, width, colors, rng):
+    """Endpoints of a random covering layout: solvable, sometimes in several ways."""
+    paths = None
+    while paths is None:
+        paths = random_layout(height, width, colors, rng)
+    grid = [[None] * width for _ in range(height)]
+    for letter, path in zip("abcdefgh", paths):
+        for cell in (path[0], path[-1]):
+            grid[cell // width][cell % width] = letter
+    return grid
+
+
+@pytest.mark.parametrize("make", [random_level, layout_level])
+@pytest.mark.parametrize("height,width,colors", [(2, 3, 2), (3, 3, 2), (3, 4, 2), (3, 4, 3),
+                                                 (4, 4, 2), (4, 4, 3), (4, 4, 4), (4, 5, 3),
+                                                 (5, 5, 3), (5, 5, 4)])
+def test_solution_counts_match_brute_force(height, width, colors, make):
+    rng = random.Random(height * 100 + width * 10 + colors)
+    for _ in range(40):
+        grid = make(height, width, colors, rng)
+        expected = count_solutions(height, width, grid, limit=3)
+        result = Solver(height, width, grid).solve(max_solutions=3)
+        assert result.complete or result.solutions == 3
+        assert result.solutions == expected, encode_level(grid)
+
+
+@pytest.mark.parametrize("level,solutions", [
+    ([5, 5, "b5c1a4c2a6b1"], 2),   # a second solution has b running alongside itself
+    ([2, 2, "aa2"], 1),            # adjacent endpoints that still need a path between them
+])
+def test_self_touching_solutions_count(level, solutions):
+    result = solve(level, max_solutions=3)
+    assert result.complete
+    assert result.solutions == solutions
+    height, width, grid = parse_level(level, letters=True)
+    assert count_solutions(height, width, grid) == solutions
+
+
+def test_solution_is_accepted_by_the_board():
+    rng = random.Random(7)
+    for _ in range(40):
+        grid = random_level(4, 5, 3, rng)
+        level = encode_level(grid)
+        result = solve(level)
+        if not result.solved:
+            continue
+        board = BoardState(level)
+        for color, path in result.paths.items():
+            board.set_path(color, path)
+        assert board.solved, level
+
+
+def test_single_solution_that_touches_itself_is_found():
+    # The first pass keeps paths clear of themselves and finds nothing here
+    result = solve([2, 2, "aa2"])
+    assert result.solved
+    assert result.paths["a"] == [(0, 0), (1, 0), (1, 1), (0, 1)]
+
+
+@pytest.mark.parametrize("height,width,colors", [(4, 4, 2), (5, 5, 3), (5, 5, 4), (6, 6, 5)])
+def test_coloring_search_finds_clear_paths(height, width, colors):
+    rng = random.Random(height * 100 + width * 10 + colors)
+    for make in (random_level, layout_level):
+        for _ in range(20):
+            grid = make(height, width, colors, rng)
+            solver = Solver(height, width, grid)
+            root = solver._root({})
+            tips_found, complete = _finish(solver._search(root, 1, touching=False))
+            found, complete = _finish(solver._color_search(root))
+            assert complete or found
+            assert bool(found) == bool(tips_found), encode_level(grid)
+            if found:
+                board = BoardState(encode_level(grid))
+                for color, path in solver._paths(found[0], {}).items():
+                    board.set_path(color, path)
+                assert board.solved, encode_level(grid)
+
+
+def test_shared_deadline_stops_the_search():
+    level = [15, 15, "2a3c6oi1d2e1g18n7e8m12n8h1l4ml12i14j1k25op7d8p4g7j7bf7k5f1c4h5a13b"]
+    height, width, grid = parse_level(level, letters=True)
+    start = time.perf_counter()
+    result = Solver(height, width, grid).solve(deadline=start + 0.05, time_limit=60)
+    assert time.perf_counter() - start < 0.3
+    assert not result.complete and not result.solved
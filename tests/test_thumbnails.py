@@ -0,0 +1,42 @@
+import threading
+
+from thumbnails import ThumbnailAtlas
+
+GOOD = [2, 3, "a1ab1b"]
+EMPTY = [0, 0, ""]
+
+
+def _wait_for(atlas, levels):
+    """Request levels and wait until the worker has dealt with every one."""
+    done = threading.Event()
+    atlas.on_ready = done.set
+    atlas.request(levels)
+    for _ in range(50):
+        atlas.update()
+        if all(atlas.get(level) is not None or atlas.failed(level) for level in levels):
+            return
+        done.wait(0.1)
+        done.clear()
+    raise AssertionError("thumbnails not ready")
+
+
+def test_bad_level_does_not_stop_the_worker(tmp_path):
+    atlas = ThumbnailAtlas(size=16, page_size=64, cache_dir=str(tmp_path))
+    _wait_for(atlas, [EMPTY, GOOD])
+    assert atlas.failed(EMPTY)
+    assert atlas.get(EMPTY) is None
+    assert atlas.get(GOOD) is not None
+    assert atlas._thread.is_alive()
+
+    other = [1, 3, "a1a"]
+    _wait_for(atlas, [EMPTY, other])
+    assert atlas.get(other) is not None
+
+
+def test_thumbnails_come_from_the_disk_cache(tmp_path):
+    first = ThumbnailAtlas(size=16, page_size=64, cache_dir=str(tmp_path))
+    _wait_for(first, [GOOD])
+    assert len(list(tmp_path.iterdir())) == 1
+    second = ThumbnailAtlas(size=16, page_size=64, cache_dir=str(tmp_path))
+    _wait_for(second, [GOOD])
+    assert second.get(GOOD) is not None
@@ -0,0 +1,35 @@
+import itertools
+
+from validate_levels import check_level, validate
+
+GOOD = [2, 3, "a1ab1b"]
+
+
+def test_check_level():
+    assert check_level(0, GOOD)["ok"]
+    assert check_level(1, [2, 2, "a3"])["errors"] == ["color 'a' has 1 endpoints, expected 2"]
+    assert check_level(2, [2, 2, "aa"])["errors"] == ["decodes to 2 cells, expected 2 x 2 = 4"]
+    assert check_level(3, "nonsense")["errors"] == ['entry is not [height, width, "encoded"]']
+
+
+def test_reports_come_back_in_order():
+    entries = [GOOD if i % 3 else [2, 2, "a3"] for i in range(50)]
+    reports = list(validate(entries, workers=2, chunksize=3))
+    assert [r["index"] for r in reports] == list(range(50))
+    assert [r["ok"] for r in reports] == [bool(i % 3) for i in range(50)]
+
+
+def test_input_is_read_lazily():
+    read = [0]
+
+    def entries():
+        for _ in itertools.count():
+            read[0] += 1
+            yield GOOD
+
+    reports = validate(entries(), workers=2, chunksize=4)
+    first = list(itertools.islice(reports, 5))
+    reports.close()
+    assert [r["index"] for r in first] == list(range(5))
+    # At most a few chunks per worker were taken from an endless pack
+    assert read[0] <= 2 * 4 * 4 + 4
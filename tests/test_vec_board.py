@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from board_state import BoardState
+from generator import random_layout
+from level_notation import encode_level
+from vec_board import COLOR_IDS, BoardBatch, random_moves
+
+LETTERS = {i: letter for letter, i in COLOR_IDS.items()}
+
+
+def layouts(size, colors, count, rng):
+    levels = []
+    while len(levels) < count:
+        paths = random_layout(size, size, colors, rng)
+        if paths is None:
+            continue
+        grid = [[None] * size for _ in range(size)]
+        for letter, path in zip("abcdefgh", paths):
+            for cell in (path[0], path[-1]):
+                grid[cell // size][cell % size] = letter
+        levels.append(encode_level(grid))
+    return levels
+
+
+def solved_on_release(state):
+    """state.complete as it would be after a mouse-up, without releasing."""
+    if state.solved:
+        return True
+    connected = state.flows_connected
+    path = state.current_path
+    if state.current_color is not None and state.paths[state.current_color] is None and len(path) > 1:
+        ends = state.endpoints[state.current_color]
+        connected += path[0] in ends and path[-1] in ends
+    return connected == len(state.endpoints) and state.filled_cells == state.height * state.width
+
+
+def play(levels, size, seed, steps=300):
+    """Random moves on a batch and on a BoardState per level, compared after each; returns solves."""
+    batch = BoardBatch(levels)
+    states = [BoardState(level) for level in levels]
+    rng = np.random.default_rng(seed)
+    solves = 0
+    for _ in range(steps):
+        move_colors, cells = random_moves(batch, rng)
+        solved = batch.step(move_colors, cells)
+        for i, state in enumerate(states):
+            letter, cell = LETTERS.get(int(move_colors[i])), divmod(int(cells[i]), size)
+            if letter != state.current_color:
+                state.release()
+                if state.grid[cell[0]][cell[1]] == letter:
+                    state.press(cell)
+            else:
+                state.drag_to(cell)
+            assert solved[i] == solved_on_release(state)
+            if solved[i] and not state.solved:
+                state.release()
+                solves += 1
+            owner = [COLOR_IDS[c] if c else 0 for row in state.cell_owner for c in row]
+            assert batch.owner[i].tolist() == owner
+    return solves
+
+
+def test_batch_matches_board_state():
+    # Random play solves 3x3 boards now and then; 5x5 ones give longer paths to break and backtrack
+    assert play(layouts(3, 2, 16, random.Random(1)), 3, seed=1) > 0
+    play(layouts(5, 3, 16, random.Random(2)), 5, seed=2)
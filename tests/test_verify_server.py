@@ -0,0 +1,117 @@
+import asyncio
+import json
+import os
+import signal
+
+import verify_server
+from verify_server import VerifyServer, verify
+
+LEVEL = [2, 3, "a1ab1b"]
+PATHS = {"a": [[0, 0], [0, 1], [0, 2]], "b": [[1, 0], [1, 1], [1, 2]]}
+
+
+def test_verify():
+    assert verify(LEVEL, PATHS) == []
+    assert verify(LEVEL, {"a": PATHS["a"]}) == ["color 'b' has no path"]
+
+
+def test_malformed_paths():
+    assert verify(LEVEL, dict(PATHS, a={"k": 1})) == ["color 'a': path must be a list of [row, col] cells"]
+    assert verify(LEVEL, dict(PATHS, a=[{"k": 1}, 3])) == ["color 'a': cells must be [row, col] pairs"]
+
+
+def test_oversized_level_is_refused_before_decoding():
+    side = verify_server.MAX_SIDE + 1
+    assert verify([side, side, "%da" % (side * side)], {}) == [
+        "bad level: height and width must be whole numbers from 1 to %d" % verify_server.MAX_SIDE]
+    assert verify([10 ** 9, 10 ** 9, "a"], {})[0].startswith("bad level")
+
+
+async def _serve(server):
+    return await asyncio.start_server(server.handle_client, "127.0.0.1", 0, limit=2 ** 20)
+
+
+def _request(i, paths=PATHS):
+    return (json.dumps({"id": i, "level": LEVEL, "paths": paths}) + "\n").encode()
+
+
+def test_reading_pauses_while_too_many_requests_wait():
+    server = VerifyServer(workers=1, batch_size=4, delay=0.001, max_waiting=8)
+    most_waiting = [0]
+    submit = server._submit
+
+    def watched_submit(line, connection):
+        submit(line, connection)
+        most_waiting[0] = max(most_waiting[0], connection.waiting)
+    server._submit = watched_submit
+
+    async def run():
+        listener = await _serve(server)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"".join(_request(i) for i in range(100)))
+        await writer.drain()
+        replies = [json.loads(await reader.readline()) for _ in range(100)]
+        writer.close()
+        listener.close()
+        return replies
+
+    try:
+        replies = asyncio.run(run())
+    finally:
+        server.close()
+    assert sorted(reply["id"] for reply in replies) == list(range(100))
+    assert all(reply["ok"] for reply in replies)
+    assert most_waiting[0] <= 8
+
+
+def test_broken_pool_rejects_the_batch_and_is_replaced():
+    server = VerifyServer(workers=1, batch_size=1, delay=0.001)
+
+    async def run():
+        listener = await _serve(server)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(_request(0))
+        first = json.loads(await reader.readline())
+        broken = server.pool
+        for pid in list(broken._processes):
+            os.kill(pid, signal.SIGKILL)
+        writer.write(_request(1))
+        second = json.loads(await reader.readline())
+        writer.write(_request(2))
+        third = json.loads(await reader.readline())
+        writer.close()
+        listener.close()
+        return broken, first, second, third
+
+    try:
+        broken, first, second, third = asyncio.run(run())
+    finally:
+        server.close()
+    assert first == {"id": 0, "ok": True, "errors": []}
+    assert second["id"] == 1 and not second["ok"]
+    assert third == {"id": 2, "ok": True, "errors": []}
+    assert server.pool is not broken
+    assert server.rejected == 1
+
+
+def test_malformed_path_does_not_hold_up_the_batch():
+    server = VerifyServer(workers=1, batch_size=2, delay=0.01)
+
+    async def run():
+        listener = await _serve(server)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(_request(0) + _request(1, dict(PATHS, a={"k": 1})))
+        replies = [json.loads(await reader.readline()) for _ in range(2)]
+        writer.close()
+        listener.close()
+        return replies
+
+    try:
+        replies = sorted(asyncio.run(run()), key=lambda reply: reply["id"])
+    finally:
+        server.close()
+    assert replies[0] == {"id": 0, "ok": True, "errors": []}
+    assert replies[1]["id"] == 1 and not replies[1]["ok"]
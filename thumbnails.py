@@ -0,0 +1,169 @@
+"""
+Level previews for the level browser, rendered off the main thread.
+
+Thumbnails are 8-bit images in the indices of one shared Palette (every
+color letter), so they are drawn once per level, whatever the color scheme,
+and live in a few large atlas pages that are recolored with set_palette.
+A worker thread renders the levels asked for most recently and hands the
+pixels over to update() on the main thread, which copies them into the atlas.
+Rendered thumbnails are also written to a disk cache keyed by a hash of the
+level, so later runs only read a few kilobytes per level.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import pygame
+
+from colors import DEFAULT_COLORS, Palette
+from level_notation import parse_level
+
+DEFAULT_CACHE_DIR = (os.environ.get("FLOW_THUMB_CACHE")
+                     or os.path.join(os.path.expanduser("~"), ".cache", "flow-free", "thumbnails"))
+
+
+def level_key(level_data, size):
+    """Hash naming a level's thumbnail of the given size in the disk cache."""
+    height, width, encoded = level_data
+    return hashlib.sha1(("%dx%d:%s:%d" % (height, width, encoded, size)).encode()).hexdigest()
+
+
+def render_thumbnail(level_data, size, palette):
+    """A size x size 8-bit surface: the grid and endpoints, in palette indices."""
+    height, width, grid = parse_level(level_data, letters=True)
+    # Only the indices matter, so no palette is loaded (this runs on the worker)
+    surface = pygame.Surface((size, size), depth=8)
+    surface.fill(Palette.BACKGROUND)
+    cell = max(1, size // max(height, width))
+    left = (size - width * cell) // 2
+    top = (size - height * cell) // 2
+    for r in range(height):
+        for c in range(width):
+            rect = pygame.Rect(left + c * cell, top + r * cell, cell, cell)
+            if cell >= 4:
+                pygame.draw.rect(surface, Palette.GRID, rect, width=1)
+            letter = grid[r][c]
+            if letter is not None:
+                color = palette.index[letter]
+                if cell >= 6:
+                    pygame.draw.circle(surface, color, rect.center, cell // 2 - 1)
+                else:
+                    surface.fill(color, rect)
+    return surface
+
+
+class ThumbnailAtlas:
+    def __init__(self, size=56, page_size=1024, max_pages=4, cache_dir=DEFAULT_CACHE_DIR):
+        self.size = size
+        self.page_size = page_size
+        self.per_row = page_size // size
+        self.capacity = max_pages * self.per_row ** 2
+        self.cache_dir = cache_dir
+        self.palette = Palette(list(DEFAULT_COLORS))
+        self.on_ready = None         # called from the worker thread when a thumbnail is done
+        self.pages = []
+        self._slots = OrderedDict()  # level tuple -> (page, rect), least recently used first
+        self._wanted = []            # levels the worker should render next, first first
+        self._ready = []             # (level tuple, pixel bytes) waiting for update()
+        self._failed = set()         # levels that could not be drawn, e.g. 0 x 0 ones
+        self._lock = threading.Condition()
+        self._thread = None
+
+    def get(self, level_data):
+        """(page surface, rect) holding level_data's thumbnail, or None if it isn't ready."""
+        slot = self._slots.get(tuple(level_data))
+        if slot is not None:
+            self._slots.move_to_end(tuple(level_data))
+        return slot
+
+    def failed(self, level_data):
+        """True if level_data's thumbnail could not be drawn; it is not tried again."""
+        with self._lock:
+            return tuple(level_data) in self._failed
+
+    def request(self, levels):
+        """
+        Render these levels next, in order, dropping earlier requests: after a
+        fast scroll the worker moves straight on to what is now on screen.
+        """
+        with self._lock:
+            wanted = [tuple(level) for level in levels
+                      if tuple(level) not in self._slots and tuple(level) not in self._failed]
+            self._wanted = wanted
+            if wanted:
+                self._lock.notify()
+        if wanted and (self._thread is None or not self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._work, daemon=True)
+            self._thread.start()
+
+    def update(self):
+        """Copy finished thumbnails into the atlas. Returns True if any arrived."""
+        if self.palette.stale:
+            self.palette.apply(*self.pages)
+        with self._lock:
+            ready, self._ready = self._ready, []
+        for level, pixels in ready:
+            if level in self._slots:
+                continue
+            page, rect = self._allocate()
+            image = pygame.image.frombuffer(pixels, (self.size, self.size), "P")
+            image.set_palette(self.palette.colors())
+            page.blit(image, rect)
+            self._slots[level] = (page, rect)
+        return bool(ready)
+
+    def _allocate(self):
+        """A free slot, taking the least recently used one once the atlas is full."""
+        if len(self._slots) >= self.capacity:
+            return self._slots.popitem(last=False)[1]
+        i = len(self._slots)
+        page_index, i = divmod(i, self.per_row ** 2)
+        if page_index == len(self.pages):
+            page = pygame.Surface((self.page_size, self.page_size), depth=8)
+            self.palette.apply(page)
+            self.pages.append(page)
+        row, col = divmod(i, self.per_row)
+        return self.pages[page_index], pygame.Rect(col * self.size, row * self.size,
+                                                   self.size, self.size)
+
+    def _work(self):
+        while True:
+            with self._lock:
+                while not self._wanted:
+                    self._lock.wait()
+                level = self._wanted.pop(0)
+            try:
+                pixels = self._load(level)
+            except Exception:
+                # A malformed level gets no thumbnail, but must not stop the others
+                with self._lock:
+                    self._failed.add(level)
+                continue
+            with self._lock:
+                self._ready.append((level, pixels))
+            if self.on_ready:
+                self.on_ready()
+
+    def _load(self, level):
+        """Pixel indices for level's thumbnail, from the disk cache or freshly rendered."""
+        path = os.path.join(self.cache_dir, level_key(level, self.size) + ".thumb")
+        try:
+            with open(path, "rb") as f:
+                pixels = f.read()
+            if len(pixels) == self.size * self.size:
+                return pixels
+        except OSError:
+            pass
+        surface = render_thumbnail(level, self.size, self.palette)
+        pixels = pygame.image.tobytes(surface, "P")
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Written under a temporary name, so a crash never leaves half a thumbnail
+            tmp = "%s.%d.tmp" % (path, threading.get_ident())
+            with open(tmp, "wb") as f:
+                f.write(pixels)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # no cache this time, e.g. a read-only home directory
+        return pixels
@@ -0,0 +1,154 @@
+"""
+Headless level-pack validator.
+
+    python validate_levels.py levels.py
+    python validate_levels.py pack.jsonl --workers 8 --output report.jsonl
+
+A pack is a Python file defining LEVELS, a binary .pack file, a JSON array,
+or JSON lines (one [height, width, "encoded"] entry per line, or
+generator.py's output); .pack and JSON-lines input is streamed. Every level is checked in a process pool and
+one JSON object per level is written in pack order, followed by a summary
+object on stderr. The exit status is 1 if any level failed. Nothing here
+imports pygame.
+"""
+import argparse
+import collections
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from colors import COLOR_MAP
+from level_notation import decode_cells
+from levels import read_levels
+from solver import Solver
+
+def decode_letters(height, width, encoded):
+    """
+    Strictly decode an encoded level into a grid of color letters (None for
+    empty cells). Returns (grid, errors); grid is None when the cell count is wrong.
+    Unlike parse_level(strict=True) this collects every problem instead of
+    stopping at the first.
+    """
+    errors = []
+    size = height * width
+    cells = decode_cells(encoded, size)
+    for letter in sorted({c for c in cells if c is not None}):
+        if letter not in COLOR_MAP:
+            if letter.isalpha():
+                errors.append("unknown color letter %r" % letter)
+            else:
+                errors.append("unexpected character %r" % letter)
+
+    if len(cells) != size:
+        errors.append("decodes to %s cells, expected %d x %d = %d"
+                      % ("more than %d" % size if len(cells) > size else len(cells),
+                         height, width, size))
+        return None, errors
+    return [cells[r * width:(r + 1) * width] for r in range(height)], errors
+
+
+def check_level(index, level_data, node_limit=None):
+    """Validate one pack entry; returns a JSON-serialisable report dict."""
+    report = {"index": index, "ok": False, "errors": []}
+    try:
+        height, width, encoded = level_data
+        if not (isinstance(height, int) and isinstance(width, int) and isinstance(encoded, str)):
+            raise TypeError
+    except (TypeError, ValueError):
+        report["errors"].append("entry is not [height, width, \"encoded\"]")
+        return report
+    if height <= 0 or width <= 0:
+        report["errors"].append("height and width must be positive")
+        return report
+
+    grid, errors = decode_letters(height, width, encoded)
+    report["errors"].extend(errors)
+    if grid is None:
+        return report
+
+    counts = {}
+    for row in grid:
+        for letter in row:
+            if letter is not None:
+                counts[letter] = counts.get(letter, 0) + 1
+    for letter, n in sorted(counts.items()):
+        if n != 2:
+            report["errors"].append("color %r has %d endpoints, expected 2" % (letter, n))
+    if report["errors"]:
+        return report
+
+    result = Solver(height, width, grid).solve(max_solutions=2, node_limit=node_limit)
+    report["solutions"] = result.solutions
+    report["complete"] = result.complete
+    report["nodes"] = result.nodes
+    report["elapsed"] = round(result.elapsed, 6)
+    if not result.solved:
+        report["errors"].append("unsolvable" if result.complete else "no solution within node limit")
+    elif result.solutions > 1:
+        report["errors"].append("solution is not unique")
+    elif not result.complete:
+        report["errors"].append("uniqueness undetermined within node limit")
+    report["ok"] = not report["errors"]
+    return report
+
+
+def _check_chunk(jobs):
+    return [check_level(index, level_data, node_limit) for index, level_data, node_limit in jobs]
+
+
+def validate(entries, workers=None, chunksize=32, node_limit=None):
+    """
+    Check entries across a process pool, yielding reports in input order.
+
+    Chunks are submitted as the ones ahead of them are collected, so workers
+    never wait for a batch to drain, and at most a few chunks per worker are
+    in flight (Pool.imap would read the whole input up front), so memory
+    stays flat however long the pack is.
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = ((i, entry, node_limit) for i, entry in enumerate(entries))
+    chunks = iter(lambda: list(itertools.islice(jobs, chunksize)), [])
+    in_flight = collections.deque()  # AsyncResults, oldest chunk first
+    with multiprocessing.Pool(workers) as pool:
+        for chunk in chunks:
+            in_flight.append(pool.apply_async(_check_chunk, (chunk,)))
+            if len(in_flight) >= workers * 4:
+                yield from in_flight.popleft().get()
+        while in_flight:
+            yield from in_flight.popleft().get()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate a level pack headlessly.")
+    parser.add_argument("pack", help="levels .py file, .pack file, .json array or JSON-lines file")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=32, help="levels per worker task")
+    parser.add_argument("--node-limit", type=int, default=200000,
+                        help="solver nodes per level before giving up (0 = unlimited)")
+    parser.add_argument("--output", default="-", help="report file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    start = time.perf_counter()
+    total = failed = 0
+    try:
+        for report in validate(read_levels(args.pack), args.workers, args.chunksize,
+                               args.node_limit or None):
+            total += 1
+            failed += not report["ok"]
+            out.write(json.dumps(report) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    summary = {"levels": total, "failed": failed,
+               "elapsed": round(time.perf_counter() - start, 3)}
+    print(json.dumps(summary), file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Batched, headless boards for automated players and bulk simulation.
+
+    python vec_board.py --boards 4096 --steps 500 --size 9 --colors 6
+
+BoardBatch holds K same-sized levels as stacked NumPy arrays and applies one
+move per board per step() with Board's drag rules. A move is (color, cell):
+
+  - a color other than the board's active one ends the current drag as a
+    mouse-up would (a path that doesn't reach its other endpoint is
+    released), and if cell is an endpoint of the new color, a drag of that
+    color starts there and its old path is cleared;
+  - the active color moves like Board._try_add_cell: another color's
+    endpoint blocks, the cell must share a side with the path's tip, a cell
+    of another path breaks that whole path, and a cell of this path
+    backtracks to it.
+
+solved() and fill() match Board.complete and Board.fill_percent as they
+would be after releasing the mouse. Boards that become solved ignore
+further moves, like Board, until reset(). Requires numpy; nothing here
+imports pygame.
+"""
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+from colors import COLOR_MAP
+from level_notation import parse_level
+
+# Color letter -> id used in the arrays; 0 means empty
+COLOR_IDS = {letter: i for i, letter in enumerate(COLOR_MAP, 1)}
+
+
+class BoardBatch:
+    def __init__(self, levels):
+        levels = list(levels)
+        if not levels:
+            raise ValueError("need at least one level")
+        grids = []
+        for level in levels:
+            height, width, cells = parse_level(level, flat=True, letters=True)
+            if grids and (height, width) != (self.height, self.width):
+                raise ValueError("all levels in a batch must have the same size")
+            self.height, self.width = height, width
+            grids.append([COLOR_IDS[c] if c is not None else 0 for c in cells])
+
+        self.count = len(levels)
+        self.size = self.height * self.width
+        self.grid = np.array(grids, dtype=np.int8)      # (K, N) endpoint color ids
+        self.colors = int(self.grid.max()) + 1           # id slots in use, including 0
+        self._rows = np.arange(self.count)
+        self._ids = np.arange(self.colors, dtype=np.int8)
+        present = np.zeros((self.count, self.colors), dtype=bool)
+        present[self._rows[:, None], self.grid.astype(np.intp)] = True
+        present[:, 0] = False
+        self.present = present                           # (K, C) colors used by each level
+
+        shape = (self.count, self.size)
+        self.owner = np.zeros(shape, dtype=np.int8)      # (K, N) color id or 0
+        self.order = np.full(shape, -1, dtype=np.int16)  # position along its path, -1 if free
+        shape = (self.count, self.colors)
+        self.tip = np.full(shape, -1, dtype=np.intp)     # (K, C) last cell of each path, -1 if none
+        self.length = np.zeros(shape, dtype=np.intp)
+        self.active = np.zeros(self.count, dtype=np.int8)  # color being dragged, 0 if none
+        self.done = np.zeros(self.count, dtype=bool)
+        self._filled = np.zeros(self.count, dtype=np.intp)  # cells on a path, kept by every move
+
+        # Flat views: moves touch one (board, cell) or (board, color) each, and
+        # indexing a 1-D view with board * stride + i is much cheaper than
+        # 2-D fancy indexing
+        self._grid = self.grid.reshape(-1)
+        self._owner = self.owner.reshape(-1)
+        self._order = self.order.reshape(-1)
+        self._tip = self.tip.reshape(-1)
+        self._length = self.length.reshape(-1)
+
+    def reset(self, mask=None):
+        """Clear every path on the boards selected by mask (default: all)."""
+        rows = self._rows if mask is None else np.nonzero(mask)[0]
+        self.owner[rows] = 0
+        self.order[rows] = -1
+        self.tip[rows] = -1
+        self.length[rows] = 0
+        self.active[rows] = 0
+        self.done[rows] = False
+        self._filled[rows] = 0
+
+    # --- Moves -------------------------------------------------------------
+
+    def step(self, colors, cells):
+        """
+        Apply one move per board: colors are ids (see COLOR_IDS), cells flat
+        indices row * width + col. Returns the solved mask after the move.
+        """
+        colors = np.asarray(colors, dtype=np.intp)
+        cells = np.asarray(cells, dtype=np.intp)
+        live = ~self.done
+        here = self._grid[self._rows * self.size + cells]
+
+        # A different color is a mouse-up, then a mouse-down on cell
+        switch = live & (colors != self.active)
+        self.end_drag(switch)
+        rows = np.nonzero(switch & (here == colors))[0]
+        if rows.size:
+            c = colors[rows]
+            self._clear(rows, c)
+            at = rows * self.size + cells[rows]
+            slot = rows * self.colors + c
+            self._owner[at] = c
+            self._order[at] = 0
+            self._tip[slot] = cells[rows]
+            self._length[slot] = 1
+            self._filled[rows] += 1
+            self.active[rows] = c
+
+        # Same color: extend, break or backtrack, if the cell is open and next to the tip
+        tip = self._tip[self._rows * self.colors + colors]
+        dr = np.abs(tip // self.width - cells // self.width)
+        dc = np.abs(tip % self.width - cells % self.width)
+        move = (live & ~switch & (tip >= 0) & (dr + dc == 1)
+                & ((here == 0) | (here == colors)))
+        rows = np.nonzero(move)[0]
+        if rows.size:
+            self._move(rows, colors[rows], cells[rows])
+
+        solved = self.solved()
+        self.done |= solved
+        return solved
+
+    def end_drag(self, mask=None):
+        """Mouse-up on the selected boards: release active paths that aren't connected."""
+        active = self.active != 0
+        rows = np.nonzero(active if mask is None else mask & active)[0]
+        if not rows.size:
+            return
+        c = self.active[rows].astype(np.intp)
+        slot = rows * self.colors + c
+        tip = self._tip[slot]
+        joined = (self._length[slot] >= 2) & (self._grid[rows * self.size + tip] == c)
+        self._clear(rows[~joined], c[~joined])
+        self.active[rows] = 0
+
+    def _move(self, rows, c, cell):
+        at = rows * self.size + cell
+        owner = self._owner[at].astype(np.intp)
+
+        # A cell of another color's path removes that path
+        broken = (owner != 0) & (owner != c)
+        if broken.any():
+            self._clear(rows[broken], owner[broken])
+
+        # A cell already on this path backtracks to it. Usually that's one
+        # step back, which only releases the tip; otherwise the board's row
+        # is searched for every cell past it.
+        back = owner == c
+        if back.any():
+            r, bc = rows[back], c[back]
+            slot = r * self.colors + bc
+            idx = self._order[at[back]].astype(np.intp)
+            length = self._length[slot]
+            short = idx == length - 2
+            tip_at = r[short] * self.size + self._tip[slot[short]]
+            self._owner[tip_at] = 0
+            self._order[tip_at] = -1
+            long = ~short
+            if long.any():
+                lr = r[long]
+                owner_rows, order_rows = self.owner[lr], self.order[lr]
+                release = (owner_rows == bc[long, None]) & (order_rows > idx[long, None])
+                owner_rows[release] = 0
+                order_rows[release] = -1
+                self.owner[lr] = owner_rows
+                self.order[lr] = order_rows
+            self._filled[r] -= length - 1 - idx
+            self._tip[slot] = cell[back]
+            self._length[slot] = idx + 1
+
+        grow = ~back
+        r, gc = rows[grow], c[grow]
+        slot = r * self.colors + gc
+        length = self._length[slot]
+        self._owner[at[grow]] = gc
+        self._order[at[grow]] = length
+        self._tip[slot] = cell[grow]
+        self._length[slot] = length + 1
+        self._filled[r] += 1
+
+    def _clear(self, rows, c):
+        """Remove color c[i]'s path from board rows[i] (rows are distinct)."""
+        if not rows.size:
+            return
+        owner_rows, order_rows = self.owner[rows], self.order[rows]
+        mask = owner_rows == c[:, None]
+        owner_rows[mask] = 0
+        order_rows[mask] = -1
+        self.owner[rows] = owner_rows
+        self.order[rows] = order_rows
+        slot = rows * self.colors + c
+        self._filled[rows] -= self._length[slot]
+        self._tip[slot] = -1
+        self._length[slot] = 0
+
+    # --- Queries (vectorized over the batch) ------------------------------
+
+    def connected(self, rows=None):
+        """(K, C) bool: the path of each color runs from one endpoint to the other."""
+        rows = self._rows if rows is None else rows
+        tip = self.tip[rows]
+        tip_owner = self.grid[rows[:, None], np.maximum(tip, 0)]
+        return (self.length[rows] >= 2) & (tip_owner == self._ids)
+
+    def filled(self):
+        """(K,) number of cells on a path."""
+        return self._filled.copy()
+
+    def fill(self):
+        """(K,) fraction of cells on a path, Board.fill_percent / 100."""
+        return self.filled() / self.size
+
+    def solved(self):
+        """(K,) every color connected and every cell filled, as Board.complete after a mouse-up."""
+        solved = self._filled == self.size
+        rows = np.nonzero(solved)[0]
+        if rows.size:
+            # Only full boards can be solved, so only they need the path check
+            solved[rows] = (self.connected(rows) | ~self.present[rows]).all(axis=1)
+        return solved
+
+    def paths(self, index):
+        """Board index's paths as {letter: [(row, col), ...]}, in Board.paths form."""
+        letters = {i: letter for letter, i in COLOR_IDS.items()}
+        result = {}
+        for c in np.nonzero(self.present[index])[0]:
+            cells = np.nonzero(self.owner[index] == c)[0]
+            if not cells.size:
+                result[letters[c]] = None
+                continue
+            cells = cells[np.argsort(self.order[index, cells])]
+            result[letters[c]] = [divmod(int(cell), self.width) for cell in cells]
+        return result
+
+
+def random_moves(batch, rng):
+    """One random move per board: mostly a step from an active tip, otherwise a new drag."""
+    k = batch.count
+    colors = batch.active.astype(np.intp)
+    restart = (colors == 0) | (rng.random(k) < 0.05)
+    if restart.any():
+        # Pick a used color and one of its endpoints
+        weights = batch.present[restart].astype(float)
+        picks = (weights.cumsum(1) > rng.random((int(restart.sum()), 1)) * weights.sum(1, keepdims=True))
+        colors[restart] = picks.argmax(1)
+    tip = batch.tip[np.arange(k), colors]
+    step = np.array([-batch.width, batch.width, -1, 1])[rng.integers(0, 4, k)]
+    cells = np.clip(tip + step, 0, batch.size - 1)
+    if restart.any():
+        rows = np.nonzero(restart)[0]
+        ends = batch.grid[rows] == colors[rows, None]
+        cells[rows] = ends.argmax(1)
+    return colors, cells
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure BoardBatch throughput with random moves.")
+    parser.add_argument("--boards", type=int, default=4096)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--size", type=int, default=9)
+    parser.add_argument("--colors", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from generator import random_layout
+    from level_notation import encode_level
+
+    layout_rng = random.Random(args.seed)
+    levels = []
+    while len(levels) < min(args.boards, 64):
+        paths = random_layout(args.size, args.size, args.colors, layout_rng)
+        if paths is None:
+            continue
+        grid = [[None] * args.size for _ in range(args.size)]
+        for letter, path in zip(COLOR_MAP, paths):
+            for cell in (path[0], path[-1]):
+                grid[cell // args.size][cell % args.size] = letter
+        levels.append(encode_level(grid))
+
+    batch = BoardBatch(levels[i % len(levels)] for i in range(args.boards))
+    rng = np.random.default_rng(args.seed)
+    elapsed = 0.0
+    for _ in range(args.steps):
+        colors, cells = random_moves(batch, rng)
+        start = time.perf_counter()
+        batch.step(colors, cells)
+        elapsed += time.perf_counter() - start
+        if batch.done.any():
+            batch.reset(batch.done)
+    moves = args.boards * args.steps
+    print("%d boards x %d steps: %.2f M moves/s (%.1f us per step)"
+          % (args.boards, args.steps, moves / elapsed / 1e6, elapsed / args.steps * 1e6))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
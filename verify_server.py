@@ -0,0 +1,295 @@
+"""
+Solution checker for the leaderboard: a local asyncio JSON-lines service.
+
+    python verify_server.py [--host 127.0.0.1] [--port 8765] [--workers N]
+
+Clients send one JSON object per line,
+
+    {"id": 7, "level": [height, width, "encoded"], "paths": {"a": [[0, 0], [0, 1], ...], ...}}
+
+where "level" may also be an index into the built-in levels and "paths" is
+Board.paths with cells as [row, col]. Each gets one line back, in whatever
+order checks finish: {"id": 7, "ok": true, "errors": []}. A solution is
+correct when every color's path runs cell by adjacent cell from one of its
+endpoints to the other, no cell is used twice, and every cell is covered.
+
+Request lines from all connections are queued and checked in batches (up
+to --batch of them, or whatever arrived within --delay seconds), one process
+pool task per batch, so scheduling is paid per batch rather than per
+request. Workers parse the JSON, check, and encode the replies themselves,
+leaving the event loop to move bytes, and cache parsed levels. A connection
+with --max-waiting requests still being checked is not read from until some
+are answered, so a fast client can't queue unbounded work. Nothing here
+imports pygame.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+from level_notation import parse_level
+
+# Largest board side accepted, checked before a level is decoded
+MAX_SIDE = 256
+
+
+@lru_cache(maxsize=4096)
+def _level(height, width, encoded):
+    """(height, width, endpoints) with endpoints: color -> frozenset of its two cells."""
+    if not (type(height) is int and type(width) is int
+            and 0 < height <= MAX_SIDE and 0 < width <= MAX_SIDE):
+        raise ValueError("height and width must be whole numbers from 1 to %d" % MAX_SIDE)
+    height, width, cells = parse_level([height, width, encoded], strict=True, flat=True, letters=True)
+    endpoints = {}
+    for i, color in enumerate(cells):
+        if color is not None:
+            endpoints.setdefault(color, set()).add(divmod(i, width))
+    for color, ends in endpoints.items():
+        if len(ends) != 2:
+            raise ValueError("color %r has %d endpoints, expected 2" % (color, len(ends)))
+    return height, width, {color: frozenset(ends) for color, ends in endpoints.items()}
+
+
+def verify(level_data, paths):
+    """Problems with a submitted solution for level_data; an empty list means it's correct."""
+    try:
+        if isinstance(level_data, int):
+            from levels import get_level
+            level_data = get_level(level_data)
+        height, width, encoded = level_data
+        height, width, endpoints = _level(height, width, encoded)
+    except (TypeError, ValueError) as e:
+        return ["bad level: %s" % e]
+    if not isinstance(paths, dict):
+        return ["paths must map color letters to lists of [row, col] cells"]
+
+    errors = ["color %r is not in this level" % color for color in sorted(set(paths) - set(endpoints))]
+    owner = [None] * (height * width)  # r * width + c -> color of the path through it
+    covered = 0
+    for color in sorted(endpoints):
+        path = paths.get(color)
+        if not path:
+            errors.append("color %r has no path" % color)
+            continue
+        if not isinstance(path, list):
+            errors.append("color %r: path must be a list of [row, col] cells" % color)
+            continue
+        try:
+            if {tuple(path[0]), tuple(path[-1])} != endpoints[color]:
+                errors.append("color %r does not join its endpoints" % color)
+            prev_r = prev_c = None
+            for r, c in path:
+                if not (type(r) is int and type(c) is int and 0 <= r < height and 0 <= c < width):
+                    errors.append("color %r: %s is not a cell on the board" % (color, [r, c]))
+                    break
+                if prev_r is not None and abs(r - prev_r) + abs(c - prev_c) != 1:
+                    errors.append("color %r jumps from %s to %s" % (color, [prev_r, prev_c], [r, c]))
+                    break
+                index = r * width + c
+                if owner[index] is not None:
+                    errors.append("color %r overlaps %r at %s" % (color, owner[index], [r, c]))
+                    break
+                owner[index] = color
+                covered += 1
+                prev_r, prev_c = r, c
+        except (TypeError, ValueError):
+            errors.append("color %r: cells must be [row, col] pairs" % color)
+
+    if not errors and covered != height * width:
+        errors.append("%d of %d cells are not covered" % (height * width - covered, height * width))
+    return errors
+
+
+def verify_lines(lines):
+    """
+    Reply lines for a batch of request lines; one process pool task. Decoding
+    and encoding JSON happens here too, so the event loop only moves bytes.
+    """
+    replies = []
+    for line in lines:
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError
+        except ValueError:
+            request = {}
+            errors = ["request must be a JSON object on one line"]
+        else:
+            try:
+                errors = verify(request.get("level"), request.get("paths"))
+            except Exception as e:
+                # A request verify() didn't foresee must not cost the rest of the batch
+                errors = ["could not check this request: %s" % type(e).__name__]
+        reply = {"id": request.get("id"), "ok": not errors, "errors": errors}
+        replies.append((json.dumps(reply) + "\n").encode())
+    return replies
+
+
+def reject_lines(lines, error):
+    """Reply lines refusing a batch unchecked, keeping whatever ids can be read."""
+    replies = []
+    for line in lines:
+        try:
+            request = json.loads(line)
+            request_id = request.get("id") if isinstance(request, dict) else None
+        except ValueError:
+            request_id = None
+        replies.append((json.dumps({"id": request_id, "ok": False, "errors": [error]}) + "\n").encode())
+    return replies
+
+
+class _Connection:
+    """A client's stream writer and how many of its requests are still being checked."""
+    def __init__(self, writer):
+        self.writer = writer
+        self.waiting = 0
+        self._limit = None   # count wait_below() is waiting for waiting to drop under
+        self._wakeup = None  # future wait_below() is waiting on
+
+    def reply(self, data):
+        if not self.writer.is_closing():
+            self.writer.write(data)
+        self.waiting -= 1
+        if self._wakeup is not None and self.waiting < self._limit and not self._wakeup.done():
+            self._wakeup.set_result(None)
+
+    async def wait_below(self, limit):
+        """Wait until fewer than limit of this connection's requests are being checked."""
+        if self.waiting >= limit:
+            self._limit = limit
+            self._wakeup = asyncio.get_running_loop().create_future()
+            try:
+                await self._wakeup
+            finally:
+                self._wakeup = None
+
+    async def finished(self):
+        await self.wait_below(1)
+
+
+class VerifyServer:
+    def __init__(self, workers=None, batch_size=256, delay=0.002, max_waiting=1024):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.delay = delay
+        self.max_waiting = max_waiting  # unanswered requests per connection before reading pauses
+        self.pool = ProcessPoolExecutor(self.workers)
+        self.checked = 0
+        self.batches = 0
+        self.rejected = 0
+        self._pending = []        # (request line, connection) waiting for the next batch
+        self._timer = None        # call_later handle flushing a partial batch
+        self._running = set()     # batch tasks, kept referenced until done
+        self._slots = None        # bounds batches in flight; made on the server's loop
+
+    def _submit(self, line, connection):
+        connection.waiting += 1
+        self._pending.append((line, connection))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.delay, self._flush)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch):
+        if self._slots is None:
+            # A couple of batches per worker keeps the pool busy while results travel back
+            self._slots = asyncio.Semaphore(self.workers * 2)
+        lines = [line for line, _ in batch]
+        async with self._slots:
+            pool = self.pool
+            try:
+                replies = await asyncio.get_running_loop().run_in_executor(pool, verify_lines, lines)
+            except BrokenProcessPool:
+                # A worker died, perhaps on one of these requests: refuse the batch
+                # instead of checking it here, and give later batches a fresh pool
+                if self.pool is pool:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self.pool = ProcessPoolExecutor(self.workers)
+                replies = reject_lines(lines, "the checker crashed on this batch; please resubmit")
+                self.rejected += len(batch)
+            except Exception:
+                # Every request still gets its one reply, or its connection waits forever
+                traceback.print_exc()
+                replies = reject_lines(lines, "the checker failed on this batch; please resubmit")
+                self.rejected += len(batch)
+            else:
+                self.checked += len(batch)
+        self.batches += 1
+        for (_, connection), reply in zip(batch, replies):
+            connection.reply(reply)
+
+    async def handle_client(self, reader, writer):
+        connection = _Connection(writer)
+        try:
+            while True:
+                # Stop reading while too many of this client's requests are queued
+                await connection.wait_below(self.max_waiting)
+                try:
+                    line = await reader.readline()
+                except ValueError:  # longer than the stream limit
+                    writer.write(verify_lines([b"-"])[0])
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    # Replies go out as batches finish; meanwhile keep reading, so
+                    # a client can pipeline many requests on one connection
+                    self._submit(line, connection)
+                await writer.drain()
+            await connection.finished()
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await asyncio.start_server(self.handle_client, host, port, limit=2 ** 20)
+        address = server.sockets[0].getsockname()
+        print("Verifying on %s:%d with %d workers" % (address[0], address[1], self.workers), flush=True)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve solution checks over JSON lines.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--batch", type=int, default=256, help="most requests per worker task")
+    parser.add_argument("--delay", type=float, default=0.002,
+                        help="seconds to wait for a batch to fill before sending it anyway")
+    parser.add_argument("--max-waiting", type=int, default=1024,
+                        help="unanswered requests per connection before it stops being read")
+    args = parser.parse_args(argv)
+
+    server = VerifyServer(args.workers, args.batch, args.delay, args.max_waiting)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
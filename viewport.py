@@ -0,0 +1,90 @@
+import pygame
+
+MIN_CELL = 8     # pixels per cell when zoomed all the way out
+MAX_CELL = 120   # and all the way in
+
+
+class Viewport:
+    """
+    Camera for a board drawn inside `rect` on screen: `cell_size` pixels per
+    cell, scrolled so board pixel (x, y) sits at rect.topleft. "Board pixels"
+    are at the current zoom, i.e. cell (r, c) spans x = c * cell_size onwards.
+    """
+    def __init__(self, rect, cell_size, rows, cols):
+        self.rect = pygame.Rect(rect)
+        self.cell_size = cell_size
+        self.rows = rows
+        self.cols = cols
+        self.x = 0
+        self.y = 0
+
+    @classmethod
+    def fit(cls, rect, rows, cols, cell_size=60):
+        """A view of rect showing as much of the board as fits, at most cell_size per cell."""
+        rect = pygame.Rect(rect)
+        size = min(cell_size, rect.width // cols, rect.height // rows)
+        return cls(rect, max(MIN_CELL, size), rows, cols)
+
+    def to_board(self, pos):
+        """Screen position -> board pixel position."""
+        return pos[0] - self.rect.x + self.x, pos[1] - self.rect.y + self.y
+
+    def cell_at(self, pos):
+        """(row, col) under a screen position, or None outside the view or the board."""
+        if not self.rect.collidepoint(pos):
+            return None
+        x, y = self.to_board(pos)
+        row, col = y // self.cell_size, x // self.cell_size
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return (row, col)
+        return None
+
+    def cell_rect(self, row, col):
+        """Screen rect of a cell (possibly outside the view)."""
+        size = self.cell_size
+        return pygame.Rect(self.rect.x + col * size - self.x, self.rect.y + row * size - self.y,
+                           size, size)
+
+    def cells_rect(self, row0, col0, row1, col1):
+        """Screen rect covering cells row0..row1, col0..col1 inclusive."""
+        return self.cell_rect(row0, col0).union(self.cell_rect(row1, col1))
+
+    def visible(self, area=None):
+        """
+        (row0, col0, row1, col1), the half-open range of board cells under
+        area, a screen rect that may reach past the view (default: the view).
+        """
+        area = self.rect if area is None else area
+        size = self.cell_size
+        left, top = self.to_board(area.topleft)
+        right, bottom = left + area.width, top + area.height
+        return (max(0, top // size), max(0, left // size),
+                min(self.rows, -(-bottom // size)), min(self.cols, -(-right // size)))
+
+    def is_visible(self, row, col):
+        return self.cell_rect(row, col).colliderect(self.rect)
+
+    def pan(self, dx, dy):
+        """Scroll the board by (dx, dy) screen pixels. Returns True if the view moved."""
+        return self._move(self.x - dx, self.y - dy, self.cell_size)
+
+    def zoom(self, factor, pos=None):
+        """Scale cells by factor, keeping the board point under pos (default: view centre) still."""
+        size = max(MIN_CELL, min(MAX_CELL, int(round(self.cell_size * factor))))
+        if size == self.cell_size:
+            return False
+        if pos is None:
+            pos = self.rect.center
+        x, y = self.to_board(pos)
+        scale = size / self.cell_size
+        return self._move(int(x * scale) - (pos[0] - self.rect.x),
+                          int(y * scale) - (pos[1] - self.rect.y), size)
+
+    def _move(self, x, y, size):
+        # Keep the board on screen; a board smaller than the view stays at the top left
+        x = max(0, min(x, self.cols * size - self.rect.width))
+        y = max(0, min(y, self.rows * size - self.rect.height))
+        if (x, y, size) == (self.x, self.y, self.cell_size):
+            return False
+        self.x, self.y, self.cell_size = x, y, size
+        return True